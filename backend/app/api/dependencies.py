@@ -1,5 +1,42 @@
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_db
+from typing import Optional
 
-# Re-export database dependency
-__all__ = ["get_db"] 
\ No newline at end of file
+from fastapi import Header, HTTPException
+
+from app.core.resources import resources, get_db, get_read_db
+from app.core.admission import AdmissionController
+from app.core.config import settings
+from app.core.job_queue import JobQueue
+from app.core.middleware.profiling_middleware import is_admin
+from app.core.shared_state import SharedState
+from app.services.openai_service import OpenAIService
+from app.services.job_service import JobWorkerPool
+
+def get_openai_service() -> OpenAIService:
+    """Dependency to get the lifespan-managed OpenAI service"""
+    return resources.openai_service
+
+def get_admission_controller() -> AdmissionController:
+    """Dependency to get the per-process admission controller"""
+    return resources.admission
+
+def get_shared_state() -> SharedState:
+    """Dependency to get the host-wide shared state"""
+    return resources.shared_state
+
+def get_job_queue() -> JobQueue:
+    """Dependency to get the persistent job queue"""
+    return resources.job_queue
+
+def get_job_pool() -> Optional[JobWorkerPool]:
+    """Dependency to get this process's job workers, None when job mode is off"""
+    return resources.job_pool if settings.jobs_enabled else None
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Dependency that only lets requests with the admin token through"""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+# Re-export database dependencies
+__all__ = ["get_db", "get_read_db", "get_openai_service", "get_admission_controller", "get_shared_state", "get_job_queue", "get_job_pool", "require_admin"]
@@ -1,3 +1,5 @@
 from .recommendations import router as recommendations_router
+from .jobs import router as jobs_router
+from .admin import router as admin_router
 
-__all__ = ["recommendations_router"]
+__all__ = ["recommendations_router", "jobs_router", "admin_router"]
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+
+from app.api.dependencies import require_admin
+from app.core.resources import resources
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/slow-requests")
+async def get_slow_requests():
+    """
+    Slowest requests since startup with their stage breakdown
+    """
+    return resources.slow_requests.slowest()
+
+@router.get("/event-loop")
+async def get_event_loop():
+    """
+    Event loop lag and what the loop was doing while stalled
+    """
+    return resources.loop_monitor.metrics()
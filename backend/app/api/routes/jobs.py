@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, Dict, Optional
+
+from app.api.dependencies import get_job_queue, get_job_pool
+from app.core.config import settings
+from app.core.job_queue import JobQueue
+from app.schemas import JobCreate, JobResponse
+from app.services.job_service import JobWorkerPool, is_allowed_callback
+
+router = APIRouter()
+
+def _to_response(job: Dict[str, Any]) -> JobResponse:
+    return JobResponse(
+        id=job["id"],
+        status=job["status"],
+        attempts=job["attempts"],
+        max_attempts=job["max_attempts"],
+        result=job["result"],
+        error=job["error"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"]
+    )
+
+@router.post("/", response_model=JobResponse, status_code=202)
+async def create_job(
+    request: JobCreate,
+    queue: JobQueue = Depends(get_job_queue),
+    pool: Optional[JobWorkerPool] = Depends(get_job_pool)
+):
+    """
+    Queue a recommendation request and return its job id right away.
+    
+    Poll GET /jobs/{id} for the result, or pass callback_url to receive the
+    finished job as a POST.
+    """
+    if not settings.jobs_enabled:
+        raise HTTPException(status_code=503, detail="Job mode is disabled")
+    if request.callback_url and not is_allowed_callback(request.callback_url):
+        raise HTTPException(status_code=422, detail="callback_url host is not allowed")
+    
+    try:
+        job = await queue.submit(
+            request.dict(exclude={"callback_url"}),
+            callback_url=request.callback_url,
+            max_attempts=settings.job_max_attempts
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to queue job: {str(e)}")
+    
+    if pool is not None:
+        pool.notify()
+    return _to_response(job)
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    queue: JobQueue = Depends(get_job_queue)
+):
+    """
+    Get job status, and the recommendations once it has succeeded
+    """
+    job = await queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _to_response(job)
+
+@router.delete("/{job_id}", response_model=JobResponse)
+async def cancel_job(
+    job_id: str,
+    queue: JobQueue = Depends(get_job_queue),
+    pool: Optional[JobWorkerPool] = Depends(get_job_pool)
+):
+    """
+    Cancel a queued or running job
+    """
+    job = await queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "cancelled":
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    
+    if pool is not None:
+        pool.cancel_local(job_id)
+    return _to_response(job)
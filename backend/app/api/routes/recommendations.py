@@ -1,23 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
-from app.api.dependencies import get_db
+from app.api.dependencies import get_db, get_read_db, get_openai_service, get_admission_controller, get_shared_state
+from app.core.admission import AdmissionController
+from app.core.profiling import stage
+from app.core.shared_state import SharedState
 from app.schemas import TravelRequestCreate, TravelRequestResponse
-from app.services import RecommendationService, DatabaseService
-from app.core.exceptions import OpenAIError, DatabaseError
+from app.services import RecommendationService, DatabaseService, OpenAIService
+from app.core.exceptions import OpenAIError, DatabaseError, DeadlineExceededError, OverloadedError, IdempotencyConflictError
 
 router = APIRouter()
 
-def get_recommendation_service(db: AsyncSession = Depends(get_db)) -> RecommendationService:
+def get_recommendation_service(
+    db: AsyncSession = Depends(get_db),
+    read_db: Optional[AsyncSession] = Depends(get_read_db),
+    openai_service: OpenAIService = Depends(get_openai_service),
+    shared_state: SharedState = Depends(get_shared_state)
+) -> RecommendationService:
     """Dependency to get recommendation service"""
-    database_service = DatabaseService(db)
-    return RecommendationService(database_service)
+    database_service = DatabaseService(db, read_db)
+    return RecommendationService(database_service, openai_service, shared_state)
 
 @router.post("/", response_model=TravelRequestResponse)
 async def create_recommendations(
     request: TravelRequestCreate,
-    service: RecommendationService = Depends(get_recommendation_service)
+    response: Response,
+    service: RecommendationService = Depends(get_recommendation_service),
+    admission: AdmissionController = Depends(get_admission_controller),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     Create travel recommendations with chat-like interaction.
@@ -27,11 +38,35 @@ async def create_recommendations(
     - "Хочу в Рим, люблю історію та макарони"
     - "не хочу в Колізей"
     - "і ще не хочу в Ватикан"
+    
+    When the server is at capacity the request is answered from cache or a
+    similar past request (X-Degraded header) or rejected with Retry-After.
+    
+    Retries with the same Idempotency-Key header get the original result
+    (Idempotent-Replayed header) instead of a new generation.
     """
+    async def create():
+        return await service.create_recommendations_admitted(request, admission)
+    
     try:
-        result = await service.create_recommendations(request)
-        return TravelRequestResponse(**result)
+        # A degraded answer is stored under the Idempotency-Key like a full one
+        if idempotency_key:
+            result, replayed = await service.create_recommendations_idempotent(request, idempotency_key, create)
+            if replayed:
+                response.headers["Idempotent-Replayed"] = "true"
+        else:
+            result = await create()
+        if result.get("degraded"):
+            response.headers["X-Degraded"] = result["degraded"]
+        with stage("response_validation"):
+            return TravelRequestResponse(**result)
         
+    except OverloadedError:
+        raise
+    except IdempotencyConflictError:
+        raise
+    except DeadlineExceededError as e:
+        raise HTTPException(status_code=504, detail=e.detail)
     except OpenAIError as e:
         raise HTTPException(status_code=500, detail=str(e))
     except DatabaseError as e:
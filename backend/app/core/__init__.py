@@ -1,3 +1,3 @@
-from .exceptions import TravelRecommenderException, OpenAIError, DatabaseError
+from .exceptions import TravelRecommenderException, OpenAIError, DatabaseError, DeadlineExceededError, OverloadedError, IdempotencyConflictError
 
-__all__ = ["TravelRecommenderException", "OpenAIError", "DatabaseError"]
+__all__ = ["TravelRecommenderException", "OpenAIError", "DatabaseError", "DeadlineExceededError", "OverloadedError", "IdempotencyConflictError"]
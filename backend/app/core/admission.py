@@ -0,0 +1,136 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+from app.core.deadline import remaining
+from app.core.exceptions import OverloadedError
+
+class AdmissionController:
+    """
+    Bounds concurrent work per worker process.
+
+    Up to max_in_flight requests run at once, up to max_queue more wait in
+    FIFO order for at most queue_timeout seconds (or the request deadline).
+    Anything beyond that is rejected immediately with a Retry-After hint.
+    Rejected requests may be answered degraded, at most max_degraded at once.
+    max_in_flight <= 0 disables admission control.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float, max_degraded: int = 4):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_degraded = max_degraded
+        self._in_flight = 0
+        self._degraded_in_flight = 0
+        self._waiters: deque = deque()
+        self._avg_service_time = 1.0
+        self.stats = {
+            "admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0, "degraded": 0,
+            "rejected_degraded": 0
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_in_flight > 0
+
+    @property
+    def queue_length(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def retry_after(self) -> int:
+        """Seconds until a queued request would likely get a slot"""
+        backlog = self.queue_length + 1
+        return max(1, math.ceil(self._avg_service_time * backlog / max(self.max_in_flight, 1)))
+
+    async def acquire(self):
+        """Take a slot, waiting in the queue if needed; raises OverloadedError"""
+        if not self.enabled:
+            return
+
+        if self._in_flight < self.max_in_flight and not self.queue_length:
+            self._in_flight += 1
+            self.stats["admitted"] += 1
+            return
+
+        if self.queue_length >= self.max_queue:
+            self.stats["rejected_queue_full"] += 1
+            raise OverloadedError("request queue is full", status_code=429, retry_after=self.retry_after())
+
+        timeout = self.queue_timeout
+        left = remaining()
+        if left is not None:
+            timeout = min(timeout, max(left, 0.0))
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up, pass it on
+                self._release_slot()
+            if isinstance(e, asyncio.TimeoutError):
+                self.stats["rejected_timeout"] += 1
+                raise OverloadedError(
+                    f"no capacity within {timeout:.1f}s", status_code=503, retry_after=self.retry_after()
+                )
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        self.stats["admitted"] += 1
+
+    def _release_slot(self):
+        # Hand the slot directly to the oldest live waiter, keeping FIFO order
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def release(self, service_time: float):
+        if not self.enabled:
+            return
+        self._avg_service_time = 0.9 * self._avg_service_time + 0.1 * service_time
+        self._release_slot()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Run a block inside an admitted slot"""
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    @asynccontextmanager
+    async def degraded_slot(self):
+        """Non-blocking slot for a degraded answer; yields False when all are taken"""
+        if self._degraded_in_flight >= self.max_degraded:
+            self.stats["rejected_degraded"] += 1
+            yield False
+            return
+        self._degraded_in_flight += 1
+        try:
+            yield True
+        finally:
+            self._degraded_in_flight -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth and rejections, for autoscaling"""
+        return {
+            "in_flight": self._in_flight,
+            "queue_length": self.queue_length,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "degraded_in_flight": self._degraded_in_flight,
+            "avg_service_time_s": round(self._avg_service_time, 3),
+            **self.stats
+        }
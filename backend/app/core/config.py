@@ -1,18 +1,114 @@
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict, Field
-from typing import List
+from functools import lru_cache
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     # OpenAI Configuration
     openai_api_key: str = Field(alias="OPENAI_API_KEY")
     openai_model: str = "gpt-3.5-turbo-1106"
+    openai_structured_outputs: bool = False  # Strict json_schema output, needs a model that supports it
+    
+    # Model routing: short refinements go to the fast model, errors fall back
+    openai_fast_model: Optional[str] = "gpt-4o-mini"
+    openai_fallback_models: List[str] = ["gpt-4o-mini"]
+    route_fast_max_chars: int = 80
+    route_fast_max_places: int = 3
+    route_max_error_rate: float = 0.5  # Recent error rate that demotes a route
+    fallback_provider_base_url: Optional[str] = Field(None, alias="FALLBACK_PROVIDER_BASE_URL")  # OpenAI-compatible API
+    fallback_provider_api_key: Optional[str] = Field(None, alias="FALLBACK_PROVIDER_API_KEY")
+    fallback_provider_model: Optional[str] = Field(None, alias="FALLBACK_PROVIDER_MODEL")
+    openai_model_prices: Dict[str, List[float]] = {  # USD per 1M (input, output) tokens
+        "gpt-3.5-turbo-1106": [1.0, 2.0],
+        "gpt-4o-mini": [0.15, 0.6],
+        "gpt-4o": [2.5, 10.0]
+    }
+    
+    # Shared HTTP connection pool for upstream API calls
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http_connect_timeout: float = 5.0
+    http_http2: bool = True
+    warm_connections_on_startup: bool = Field(True, alias="WARM_CONNECTIONS_ON_STARTUP")
+    
+    # Host-wide state shared by worker processes (cache, OpenAI throttling)
+    shared_state_path: str = Field("./shared_state.db", alias="SHARED_STATE_PATH")
+    maintenance_interval: float = 600.0  # Seconds between purges of expired shared state, 0 disables
+    recommendation_cache_ttl: int = 3600  # Seconds, 0 disables caching
+    openai_requests_per_minute: int = Field(0, alias="OPENAI_REQUESTS_PER_MINUTE")  # 0 disables
+    openai_burst: int = 5
+    
+    # Off-peak pre-warming of popular requests into the shared cache
+    prewarm_enabled: bool = Field(False, alias="PREWARM_ENABLED")
+    prewarm_hours: List[int] = [2, 3, 4, 5]  # Local hours considered off-peak
+    prewarm_check_interval: int = 600  # Seconds between scheduler checks
+    prewarm_lookback_days: int = 7  # Request history mined for popular texts
+    prewarm_min_count: int = 3  # Requests needed before a text is worth pre-warming
+    prewarm_max_items: int = 50
+    prewarm_budget_usd: float = Field(0.5, alias="PREWARM_BUDGET_USD")  # Estimated spend per run
+    prewarm_completion_tokens_per_place: int = 120  # Used for the cost estimate
+    prewarm_ttl: int = 86400  # Seconds a pre-warmed answer is served
+    
+    # Admission control for the create endpoint, per worker process
+    admission_max_in_flight: int = Field(32, alias="ADMISSION_MAX_IN_FLIGHT")  # 0 disables
+    admission_max_queue: int = Field(64, alias="ADMISSION_MAX_QUEUE")
+    admission_queue_timeout: float = 5.0  # Seconds a request may wait for a slot
+    admission_degrade: bool = True  # Serve cached or similar answers instead of rejecting
+    admission_max_degraded: int = 4  # Concurrent degraded answers, the rest are rejected
+    admission_similarity: float = 0.6  # Min word overlap of a similar past request
+    
+    # Idempotency-Key support for the create endpoint
+    idempotency_ttl: int = Field(86400, alias="IDEMPOTENCY_TTL")  # Seconds a response is replayed
+    
+    # Async job mode: persistent queue processed by in-process asyncio workers
+    jobs_enabled: bool = Field(True, alias="JOBS_ENABLED")
+    job_queue_path: str = Field("./jobs.db", alias="JOB_QUEUE_PATH")
+    job_workers: int = Field(2, alias="JOB_WORKERS")  # Concurrent jobs per worker process
+    job_max_attempts: int = 3
+    job_retry_delay: float = 2.0  # Seconds, doubled after every failed attempt
+    job_timeout: float = 300.0  # Deadline of a single attempt
+    job_poll_interval: float = 0.5
+    job_cancel_check_interval: float = 2.0
+    job_callback_allowed_hosts: List[str] = ["localhost", "127.0.0.1"]
+    job_retention: float = 7 * 86400  # Seconds finished jobs are kept before deletion
+    
+    # Prompt Configuration
+    prompt_history_token_budget: int = 600  # Max tokens of conversation history per prompt
+    exclusion_replacement_rounds: int = 2  # Follow-up requests for places dropped by exclusions
+    
+    # OpenAI timeouts and hedged requests
+    openai_timeout_min: float = 5.0
+    openai_timeout_max: float = 60.0
+    openai_timeout_multiplier: float = 2.0  # Adaptive timeout = p99 latency * multiplier
+    openai_latency_min_samples: int = 20
+    openai_hedging_enabled: bool = Field(False, alias="OPENAI_HEDGING")
+    openai_hedge_percentile: float = 0.95  # Launch a second attempt after this latency
+    openai_hedge_max_ratio: float = 0.1  # At most this share of calls may be hedged
+    
+    # Admin-gated profiling and loop monitoring
+    admin_token: Optional[str] = Field(None, alias="ADMIN_TOKEN")  # Unset disables admin endpoints and profiling
+    profiling_slow_requests: int = 20  # Slowest requests kept with their stage breakdown
+    loop_monitor_enabled: bool = Field(True, alias="LOOP_MONITOR_ENABLED")
+    loop_monitor_interval: float = 0.1  # Seconds between event loop heartbeats
+    loop_block_threshold: float = 0.1  # Stall length that triggers a stack sample
     
     # Database Configuration
-    database_url: str = Field(alias="DATABASE_URL")
+    database_url: str = Field(alias="DATABASE_URL")  # Primary, receives all writes
+    database_read_url: Optional[str] = Field(None, alias="DATABASE_READ_URL")  # Read replica, defaults to the primary
+    read_your_writes_window: float = 10.0  # Seconds a just-created row is read from the primary
     
     # Server Configuration
     host: str = Field(alias="HOST")
     port: int = Field(alias="PORT")
+    shutdown_drain_timeout: float = 30.0  # Seconds to wait for in-flight requests
+    request_timeout: float = Field(60.0, alias="REQUEST_TIMEOUT")  # Default and maximum request deadline
+    workers: int = Field(1, alias="WORKERS")
+    
+    # Startup Configuration
+    lazy_init: bool = Field(True, alias="LAZY_INIT")  # Build clients on first use
+    create_tables_on_startup: bool = Field(True, alias="CREATE_TABLES_ON_STARTUP")
+    tiktoken_cache_dir: Optional[str] = Field(None, alias="TIKTOKEN_CACHE_DIR")  # Pre-seeded BPE files, avoids downloads
     
     # CORS Configuration
     cors_origins: List[str] = ["*"]  # In production, specify specific domains
@@ -22,4 +118,18 @@ class Settings(BaseSettings):
         env_file=".env"
     )
 
-settings = Settings() 
\ No newline at end of file
+@lru_cache()
+def get_settings() -> Settings:
+    """Build settings once, on first use"""
+    return Settings()
+
+class _LazySettings:
+    """Proxy that defers reading the environment until an attribute is accessed"""
+    
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+    
+    def __setattr__(self, name, value):
+        setattr(get_settings(), name, value)
+
+settings = _LazySettings()
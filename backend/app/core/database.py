@@ -1,27 +1,37 @@
-from sqlalchemy import create_engine
+from sqlalchemy import event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from app.core.config import settings
-
-# Create async engine using settings
-engine = create_async_engine(
-    settings.database_url, 
-    connect_args={"check_same_thread": False}
-)
-
-# Create async session
-AsyncSessionLocal = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 
 # Base class for models
 Base = declarative_base()
 
-# Dependency to get database session
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close() 
\ No newline at end of file
+def create_engine_for_url(database_url: str) -> AsyncEngine:
+    """Create async engine for the given database URL"""
+    connect_args = {}
+    if database_url.startswith("sqlite"):
+        connect_args["check_same_thread"] = False
+    
+    engine = create_async_engine(
+        database_url,
+        connect_args=connect_args,
+        pool_pre_ping=True
+    )
+    
+    if database_url.startswith("sqlite"):
+        # WAL lets readers proceed while another worker process is writing
+        @event.listens_for(engine.sync_engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA busy_timeout=10000")
+            cursor.close()
+    
+    return engine
+
+def create_session_factory(engine: AsyncEngine) -> sessionmaker:
+    """Create async session factory bound to engine"""
+    return sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
@@ -0,0 +1,40 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from app.core.exceptions import DeadlineExceededError
+
+# Absolute deadline (time.monotonic) of the request being processed
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+def remaining() -> Optional[float]:
+    """Seconds left until the current request deadline, None if unbounded"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+def check_deadline(stage: str = "request"):
+    """Raise DeadlineExceededError if the current deadline has passed"""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceededError(f"no time left for {stage}")
+
+@contextmanager
+def deadline_scope(timeout: Optional[float]):
+    """Run a block under a deadline, never extending an outer one"""
+    if timeout is None:
+        yield
+        return
+    
+    deadline = time.monotonic() + timeout
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
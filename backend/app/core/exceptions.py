@@ -12,4 +12,24 @@ class OpenAIError(TravelRecommenderException):
 class DatabaseError(TravelRecommenderException):
     """Exception raised when database operations fail"""
     def __init__(self, detail: str):
-        super().__init__(status_code=500, detail=f"Database error: {detail}") 
\ No newline at end of file
+        super().__init__(status_code=500, detail=f"Database error: {detail}") 
+
+class DeadlineExceededError(TravelRecommenderException):
+    """Exception raised when a request runs out of its time budget"""
+    def __init__(self, detail: str):
+        super().__init__(status_code=504, detail=f"Deadline exceeded: {detail}")
+
+class OverloadedError(TravelRecommenderException):
+    """Exception raised when the server sheds load instead of queueing more work"""
+    def __init__(self, detail: str, status_code: int = 503, retry_after: int = 1):
+        super().__init__(
+            status_code=status_code,
+            detail=f"Server overloaded: {detail}",
+            headers={"Retry-After": str(retry_after)}
+        )
+        self.retry_after = retry_after
+
+class IdempotencyConflictError(TravelRecommenderException):
+    """Exception raised when an idempotency key is reused for a different request"""
+    def __init__(self, detail: str):
+        super().__init__(status_code=422, detail=f"Idempotency conflict: {detail}")
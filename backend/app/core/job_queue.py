@@ -0,0 +1,183 @@
+import json
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from app.core.sqlite_store import SQLiteStore
+
+class JobQueue(SQLiteStore):
+    """
+    Persistent job queue in a SQLite file shared by all worker processes.
+
+    Jobs move queued -> running -> succeeded | failed | cancelled. A running
+    job holds a lease; if its worker dies the lease expires and the job is
+    claimed again.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        result TEXT,
+        error TEXT,
+        callback_url TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL,
+        run_after REAL NOT NULL,
+        locked_by TEXT,
+        locked_until REAL,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS ix_jobs_status_run_after ON jobs (status, run_after);
+    """
+
+    FINISHED = ("succeeded", "failed", "cancelled")
+    ROW_FACTORY = sqlite3.Row
+
+    @staticmethod
+    def _to_dict(row) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    @staticmethod
+    def _get(conn, job_id: str):
+        return conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job by id"""
+        return self._to_dict(await self._call(self._get, job_id, write=False))
+
+    @staticmethod
+    def _insert(conn, job_id, payload, callback_url, max_attempts, now):
+        conn.execute(
+            "INSERT INTO jobs (id, status, payload, callback_url, max_attempts, run_after, created_at, updated_at) "
+            "VALUES (?, 'queued', ?, ?, ?, ?, ?, ?)",
+            (job_id, payload, callback_url, max_attempts, now, now, now)
+        )
+        return JobQueue._get(conn, job_id)
+
+    async def submit(self, payload: Any, callback_url: Optional[str] = None, max_attempts: int = 3) -> Dict[str, Any]:
+        """Queue a job with a JSON-serializable payload"""
+        row = await self._call(
+            self._insert, uuid.uuid4().hex, json.dumps(payload, ensure_ascii=False),
+            callback_url, max_attempts, time.time()
+        )
+        return self._to_dict(row)
+
+    @staticmethod
+    def _next_due(conn, now: float):
+        # Queued jobs that are due, or running jobs whose worker stopped renewing the lease
+        return conn.execute(
+            "SELECT id FROM jobs WHERE (status = 'queued' AND run_after <= ?) "
+            "OR (status = 'running' AND locked_until < ?) ORDER BY run_after LIMIT 1",
+            (now, now)
+        ).fetchone()
+
+    @staticmethod
+    def _claim(conn, owner: str, lease_ttl: float, now: float):
+        row = JobQueue._next_due(conn, now)
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_by = ?, "
+            "locked_until = ?, updated_at = ? WHERE id = ?",
+            (owner, now + lease_ttl, now, row["id"])
+        )
+        return JobQueue._get(conn, row["id"])
+
+    async def claim(self, lease_ttl: float) -> Optional[Dict[str, Any]]:
+        """Take the next due job, or None when the queue is empty"""
+        now = time.time()
+        # Idle polls only read, so they never take the write lock from other workers
+        if await self._call(self._next_due, now, write=False) is None:
+            return None
+        return self._to_dict(await self._call(self._claim, self.owner, lease_ttl, now))
+
+    @staticmethod
+    def _finish(conn, job_id, owner, status, result, error, now) -> bool:
+        updated = conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, locked_by = NULL, locked_until = NULL, "
+            "updated_at = ? WHERE id = ? AND status = 'running' AND locked_by = ?",
+            (status, result, error, now, job_id, owner)
+        ).rowcount
+        return updated > 0
+
+    async def complete(self, job_id: str, result: Any) -> bool:
+        """Store the result of a job this process is running; False if it was cancelled meanwhile"""
+        return await self._call(
+            self._finish, job_id, self.owner, "succeeded",
+            json.dumps(result, ensure_ascii=False), None, time.time()
+        )
+
+    @staticmethod
+    def _fail(conn, job_id, owner, error, retry_delay, now):
+        job = JobQueue._get(conn, job_id)
+        if job is None or job["status"] != "running" or job["locked_by"] != owner:
+            return None
+        if job["attempts"] < job["max_attempts"]:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', error = ?, run_after = ?, locked_by = NULL, "
+                "locked_until = NULL, updated_at = ? WHERE id = ?",
+                (error, now + retry_delay, now, job_id)
+            )
+        else:
+            JobQueue._finish(conn, job_id, owner, "failed", None, error, now)
+        return JobQueue._get(conn, job_id)
+
+    async def fail(self, job_id: str, error: str, retry_delay: float) -> Optional[Dict[str, Any]]:
+        """Requeue a failed attempt after retry_delay, or fail the job when out of attempts"""
+        return self._to_dict(await self._call(self._fail, job_id, self.owner, error, retry_delay, time.time()))
+
+    @staticmethod
+    def _requeue(conn, job_id, owner, now):
+        conn.execute(
+            "UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), locked_by = NULL, "
+            "locked_until = NULL, updated_at = ? WHERE id = ? AND status = 'running' AND locked_by = ?",
+            (now, job_id, owner)
+        )
+
+    async def requeue(self, job_id: str):
+        """Give a running job back without counting the attempt, e.g. on shutdown"""
+        await self._call(self._requeue, job_id, self.owner, time.time())
+
+    @staticmethod
+    def _cancel(conn, job_id, now):
+        job = JobQueue._get(conn, job_id)
+        if job is None or job["status"] in JobQueue.FINISHED:
+            return job
+        conn.execute(
+            "UPDATE jobs SET status = 'cancelled', locked_by = NULL, locked_until = NULL, updated_at = ? WHERE id = ?",
+            (now, job_id)
+        )
+        return JobQueue._get(conn, job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued or running job; finished jobs are returned unchanged"""
+        return self._to_dict(await self._call(self._cancel, job_id, time.time()))
+
+    @staticmethod
+    def _purge(conn, before: float) -> int:
+        placeholders = ", ".join("?" for _ in JobQueue.FINISHED)
+        return conn.execute(
+            f"DELETE FROM jobs WHERE status IN ({placeholders}) AND updated_at < ?",
+            (*JobQueue.FINISHED, before)
+        ).rowcount
+
+    async def purge_finished(self, older_than: float) -> int:
+        """Delete jobs that finished more than older_than seconds ago"""
+        return await self._call(self._purge, time.time() - older_than)
+
+    @staticmethod
+    def _counts(conn):
+        return {row["status"]: row["n"] for row in conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")}
+
+    async def counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        return await self._call(self._counts, write=False)
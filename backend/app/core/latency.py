@@ -0,0 +1,35 @@
+from collections import deque
+from typing import Deque, Dict, Optional
+
+class LatencyTracker:
+    """Rolling window of observed latencies with percentile queries"""
+    
+    def __init__(self, window: int = 500):
+        self._samples: Deque[float] = deque(maxlen=window)
+    
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+    
+    @property
+    def count(self) -> int:
+        return len(self._samples)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank percentile for q in [0, 1], None without samples"""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))
+        return ordered[index]
+    
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """Percentiles in milliseconds for metrics output"""
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 1) if value is not None else None
+        
+        return {
+            "samples": self.count,
+            "p50_ms": ms(self.percentile(0.50)),
+            "p95_ms": ms(self.percentile(0.95)),
+            "p99_ms": ms(self.percentile(0.99))
+        }
@@ -1,3 +1,7 @@
 from .logging_middleware import LoggingMiddleware
+from .drain_middleware import DrainMiddleware
+from .deadline_middleware import DeadlineMiddleware
+from .profiling_middleware import ProfilingMiddleware
+from .cors_middleware import SettingsCORSMiddleware
 
-__all__ = ["LoggingMiddleware"] 
\ No newline at end of file
+__all__ = ["LoggingMiddleware", "DrainMiddleware", "DeadlineMiddleware", "ProfilingMiddleware", "SettingsCORSMiddleware"]
@@ -0,0 +1,9 @@
+from starlette.middleware.cors import CORSMiddleware
+
+from app.core.config import settings
+
+class SettingsCORSMiddleware(CORSMiddleware):
+    """CORS with origins read from settings when the middleware stack is built, not at import"""
+    
+    def __init__(self, app, **kwargs):
+        super().__init__(app, allow_origins=settings.cors_origins, **kwargs)
@@ -0,0 +1,22 @@
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+from app.core.deadline import deadline_scope
+
+DEADLINE_HEADER = "X-Request-Timeout"
+
+class DeadlineMiddleware(BaseHTTPMiddleware):
+    """Attach a deadline to each request, optionally shortened by the client"""
+    
+    async def dispatch(self, request: Request, call_next):
+        timeout = settings.request_timeout
+        header = request.headers.get(DEADLINE_HEADER)
+        if header:
+            try:
+                timeout = min(timeout, max(float(header), 0.0))
+            except ValueError:
+                pass
+        
+        with deadline_scope(timeout):
+            return await call_next(request)
@@ -0,0 +1,22 @@
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from app.core.resources import resources
+
+class DrainMiddleware(BaseHTTPMiddleware):
+    """Track in-flight requests so shutdown can wait for them to finish"""
+    
+    async def dispatch(self, request: Request, call_next):
+        if not resources.accepting:
+            return JSONResponse(
+                status_code=503,
+                content={"detail": "Server is shutting down"},
+                headers={"Connection": "close", "Retry-After": "1"}
+            )
+        
+        resources.request_started()
+        try:
+            return await call_next(request)
+        finally:
+            resources.request_finished()
@@ -0,0 +1,92 @@
+import hmac
+import io
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import HTMLResponse, PlainTextResponse
+
+from app.core.config import settings
+from app.core.profiling import stage_scope
+from app.core.resources import resources
+
+PROFILE_HEADER = "X-Profile"  # text, html or cprofile
+ADMIN_HEADER = "X-Admin-Token"
+
+def is_admin(token: Optional[str]) -> bool:
+    """Constant-time check of the admin token; admin access is off without one configured"""
+    if not settings.admin_token or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), settings.admin_token.encode("utf-8"))
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """Record stage timings of every request and profile single requests for admins"""
+    
+    async def dispatch(self, request: Request, call_next):
+        mode = request.headers.get(PROFILE_HEADER)
+        if mode and is_admin(request.headers.get(ADMIN_HEADER)):
+            return await self._profile(request, call_next, mode)
+        
+        started = time.monotonic()
+        with stage_scope() as stages:
+            response = await call_next(request)
+        finished = time.monotonic()
+        
+        duration = finished - started
+        resources.slow_requests.record(duration, {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 1),
+            "stages_ms": {name: round(seconds * 1000, 1) for name, seconds in stages.items()},
+            # Routing, request parsing and response serialization
+            "framework_ms": round(max(duration - sum(stages.values()), 0.0) * 1000, 1),
+            "loop_lag_max_ms": round(resources.loop_monitor.max_lag_between(started, finished) * 1000, 1)
+        })
+        return response
+    
+    async def _profile(self, request: Request, call_next, mode: str):
+        """Run the request under a profiler and return the report instead of the response"""
+        profiler = None
+        if mode != "cprofile":
+            try:
+                from pyinstrument import Profiler
+                profiler = Profiler(async_mode="enabled")
+            except ImportError:
+                pass
+        
+        if profiler is not None:
+            profiler.start()
+            try:
+                status = await self._run(request, call_next)
+            finally:
+                profiler.stop()
+            if mode == "html":
+                return HTMLResponse(profiler.output_html(), headers={"X-Profiled-Status": str(status)})
+            return PlainTextResponse(profiler.output_text(unicode=True), headers={"X-Profiled-Status": str(status)})
+        
+        # cProfile sees every coroutine on the loop thread, not only this request
+        import cProfile
+        import pstats
+        
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            status = await self._run(request, call_next)
+        finally:
+            profiler.disable()
+        
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(40)
+        return PlainTextResponse(output.getvalue(), headers={"X-Profiled-Status": str(status)})
+    
+    @staticmethod
+    async def _run(request: Request, call_next) -> int:
+        """Run the request to completion, including its response body"""
+        response = await call_next(request)
+        async for _ in response.body_iterator:
+            pass
+        return response.status_code
@@ -0,0 +1,181 @@
+import asyncio
+import heapq
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from app.core.latency import LatencyTracker
+
+# Stage name -> seconds for the request being processed
+_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_stages", default=None)
+
+@contextmanager
+def stage(name: str):
+    """Time a block as a named stage of the current request"""
+    stages = _stages.get()
+    if stages is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = stages.get(name, 0.0) + time.perf_counter() - started
+
+@contextmanager
+def stage_scope():
+    """Collect stage timings for one request"""
+    stages: Dict[str, float] = {}
+    token = _stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _stages.reset(token)
+
+class SlowRequestLog:
+    """Keeps the slowest requests seen, with their stage breakdown"""
+
+    def __init__(self, size: int = 20):
+        self.size = size
+        self._heap: List[tuple] = []
+        self._counter = 0
+
+    def record(self, duration: float, entry: Dict[str, Any]):
+        self._counter += 1
+        item = (duration, self._counter, entry)
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, item)
+        elif duration > self._heap[0][0]:
+            heapq.heapreplace(self._heap, item)
+
+    def slowest(self) -> List[Dict[str, Any]]:
+        return [entry for _, _, entry in sorted(self._heap, reverse=True)]
+
+# Innermost module prefixes that explain what blocked the event loop
+_BLOCKER_CATEGORIES = [
+    ("pydantic", "pydantic"),
+    ("json", "json"),
+    ("fastapi.encoders", "json"),
+    ("starlette.responses", "json"),
+    ("sqlalchemy", "sqlalchemy"),
+    ("sqlite3", "sqlite"),
+    ("aiosqlite", "sqlite"),
+    ("tiktoken", "tokenizer"),
+    ("re", "regex"),
+    ("difflib", "fuzzy-matching"),
+    ("app", "app"),
+]
+
+def _classify(frame) -> str:
+    """Category of the innermost frame from a known package"""
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        for prefix, category in _BLOCKER_CATEGORIES:
+            if module == prefix or module.startswith(prefix + "."):
+                return category
+        frame = frame.f_back
+    return "other"
+
+def _summarize(frame, depth: int = 8) -> List[str]:
+    lines = []
+    while frame is not None and len(lines) < depth:
+        code = frame.f_code
+        lines.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_lineno} {code.co_name}")
+        frame = frame.f_back
+    return lines
+
+class LoopLagMonitor:
+    """
+    Measures event loop lag and explains long stalls.
+
+    A coroutine wakes up every interval and records how late it was. A
+    watchdog thread notices when that heartbeat stops and samples the loop
+    thread's stack, so stalls are attributed to pydantic, JSON, SQLAlchemy
+    or application code.
+    """
+
+    def __init__(self, interval: float = 0.1, block_threshold: float = 0.1, history: int = 600):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.lag = LatencyTracker(window=history)
+        self.max_lag = 0.0
+        self.blocked_by: Counter = Counter()
+        self.recent_stalls: deque = deque(maxlen=10)
+        self._samples: deque = deque(maxlen=history)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._beat())
+        self._thread = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    async def _beat(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - started - self.interval, 0.0)
+            self._heartbeat = now
+            self.lag.record(lag)
+            self.max_lag = max(self.max_lag, lag)
+            self._samples.append((now, lag))
+
+    def _watch(self):
+        sampled_beat = None
+        while not self._stop.wait(self.block_threshold / 2):
+            heartbeat = self._heartbeat
+            stalled_for = time.monotonic() - heartbeat - self.interval
+            if stalled_for < self.block_threshold:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            category = _classify(frame)
+            self.blocked_by[category] += 1
+            if sampled_beat != heartbeat:
+                # One stack per stall is enough to see where it happened
+                sampled_beat = heartbeat
+                self.recent_stalls.append({
+                    "at": time.time(),
+                    "stalled_ms": round(stalled_for * 1000, 1),
+                    "category": category,
+                    "stack": _summarize(frame)
+                })
+
+    def max_lag_between(self, start: float, end: float) -> float:
+        """Worst lag recorded by beats that landed within [start, end] (time.monotonic)"""
+        return max((lag for at, lag in self._samples if start <= at <= end), default=0.0)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "lag": self.lag.snapshot(),
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "blocked_samples": dict(self.blocked_by),
+            "recent_stalls": list(self.recent_stalls)
+        }
@@ -0,0 +1,379 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Optional, TYPE_CHECKING
+
+from app.core.admission import AdmissionController
+from app.core.config import settings
+from app.core.job_queue import JobQueue
+from app.core.profiling import LoopLagMonitor, SlowRequestLog
+from app.core.database import Base, create_engine_for_url, create_session_factory
+from app.core.shared_state import SharedState
+
+if TYPE_CHECKING:
+    # Heavy SDKs are imported lazily to keep worker cold start fast
+    import httpx
+    from openai import AsyncOpenAI
+    from sqlalchemy.ext.asyncio import AsyncEngine
+    from sqlalchemy.orm import sessionmaker
+    from app.services.openai_service import OpenAIService
+    from app.services.prewarm_service import PrewarmService
+    from app.services.job_service import JobWorkerPool
+
+logger = logging.getLogger(__name__)
+
+class ResourceContainer:
+    """Process-wide clients owned by the application lifespan.
+
+    Clients are built on first use; startup only builds the OpenAI client
+    and service eagerly when ``lazy_init`` is disabled.
+    """
+
+    def __init__(self):
+        self._http_client: Optional["httpx.AsyncClient"] = None
+        self._openai_client: Optional["AsyncOpenAI"] = None
+        self._openai_service: Optional["OpenAIService"] = None
+        self._engine: Optional["AsyncEngine"] = None
+        self._session_factory: Optional["sessionmaker"] = None
+        self._read_engine: Optional["AsyncEngine"] = None
+        self._read_session_factory: Optional["sessionmaker"] = None
+        self._shared_state: Optional[SharedState] = None
+        self._prewarm_service: Optional["PrewarmService"] = None
+        self._prewarm_task: Optional[asyncio.Task] = None
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._admission: Optional[AdmissionController] = None
+        self._job_queue: Optional[JobQueue] = None
+        self._job_pool: Optional["JobWorkerPool"] = None
+        self._slow_requests: Optional[SlowRequestLog] = None
+        self._loop_monitor: Optional[LoopLagMonitor] = None
+
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.accepting = True
+
+    @staticmethod
+    def _build_http_client() -> "httpx.AsyncClient":
+        """Build the shared, tuned httpx connection pool"""
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry
+        )
+        timeout = httpx.Timeout(600.0, connect=settings.http_connect_timeout)
+
+        http2 = settings.http_http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("h2 package is not installed, falling back to HTTP/1.1")
+                http2 = False
+
+        return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+
+    @property
+    def http_client(self) -> "httpx.AsyncClient":
+        if self._http_client is None:
+            self._http_client = self._build_http_client()
+        return self._http_client
+
+    @property
+    def openai_client(self) -> "AsyncOpenAI":
+        if self._openai_client is None:
+            from openai import AsyncOpenAI
+
+            self._openai_client = AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                http_client=self.http_client,
+                max_retries=0  # OpenAIService retries within the request deadline
+            )
+        return self._openai_client
+
+    @property
+    def openai_service(self) -> "OpenAIService":
+        if self._openai_service is None:
+            from app.services.openai_service import OpenAIService
+
+            self._openai_service = OpenAIService(
+                client=self.openai_client,
+                shared_state=self.shared_state,
+                fallback_client=self._build_fallback_client()
+            )
+        return self._openai_service
+
+    def _build_fallback_client(self) -> Optional["AsyncOpenAI"]:
+        """Client for a secondary OpenAI-compatible provider, sharing the pool"""
+        if not settings.fallback_provider_base_url:
+            return None
+        
+        from openai import AsyncOpenAI
+        
+        return AsyncOpenAI(
+            api_key=settings.fallback_provider_api_key or settings.openai_api_key,
+            base_url=settings.fallback_provider_base_url,
+            http_client=self.http_client,
+            max_retries=0
+        )
+
+    @property
+    def shared_state(self) -> SharedState:
+        if self._shared_state is None:
+            self._shared_state = SharedState(settings.shared_state_path)
+        return self._shared_state
+
+    @property
+    def engine(self) -> "AsyncEngine":
+        if self._engine is None:
+            self._engine = create_engine_for_url(settings.database_url)
+        return self._engine
+
+    @property
+    def session_factory(self) -> "sessionmaker":
+        if self._session_factory is None:
+            self._session_factory = create_session_factory(self.engine)
+        return self._session_factory
+
+    @property
+    def has_read_replica(self) -> bool:
+        return bool(settings.database_read_url) and settings.database_read_url != settings.database_url
+
+    @property
+    def read_engine(self) -> "AsyncEngine":
+        """Replica engine, or the primary one when no read URL is configured"""
+        if not self.has_read_replica:
+            return self.engine
+        if self._read_engine is None:
+            self._read_engine = create_engine_for_url(settings.database_read_url)
+        return self._read_engine
+
+    @property
+    def read_session_factory(self) -> "sessionmaker":
+        if self._read_session_factory is None:
+            self._read_session_factory = create_session_factory(self.read_engine)
+        return self._read_session_factory
+
+    @property
+    def admission(self) -> AdmissionController:
+        if self._admission is None:
+            self._admission = AdmissionController(
+                settings.admission_max_in_flight,
+                settings.admission_max_queue,
+                settings.admission_queue_timeout,
+                settings.admission_max_degraded
+            )
+        return self._admission
+
+    @property
+    def slow_requests(self) -> SlowRequestLog:
+        if self._slow_requests is None:
+            self._slow_requests = SlowRequestLog(settings.profiling_slow_requests)
+        return self._slow_requests
+
+    @property
+    def loop_monitor(self) -> LoopLagMonitor:
+        if self._loop_monitor is None:
+            self._loop_monitor = LoopLagMonitor(settings.loop_monitor_interval, settings.loop_block_threshold)
+        return self._loop_monitor
+
+    @property
+    def job_queue(self) -> JobQueue:
+        if self._job_queue is None:
+            self._job_queue = JobQueue(settings.job_queue_path)
+        return self._job_queue
+
+    @property
+    def job_pool(self) -> "JobWorkerPool":
+        if self._job_pool is None:
+            from app.services.job_service import JobWorkerPool
+
+            self._job_pool = JobWorkerPool(
+                self.job_queue,
+                self.session_factory,
+                lambda: self.openai_service,  # Built when the first job runs
+                shared_state=self.shared_state,
+                http_client=lambda: self.http_client,
+                concurrency=settings.job_workers
+            )
+        return self._job_pool
+
+    @property
+    def prewarm_service(self) -> "PrewarmService":
+        if self._prewarm_service is None:
+            from app.services.prewarm_service import PrewarmService
+
+            self._prewarm_service = PrewarmService(self.read_session_factory, self.openai_service, self.shared_state)
+        return self._prewarm_service
+
+    async def startup(self):
+        """Prepare the database and optionally build and warm clients"""
+        import app.models  # noqa: F401  (register tables on Base.metadata)
+
+        self.accepting = True
+
+        if settings.create_tables_on_startup:
+            async with self.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+        if not settings.lazy_init:
+            self.openai_service  # Property access builds the client stack
+
+        if settings.warm_connections_on_startup:
+            await self.warm()
+
+        if settings.loop_monitor_enabled:
+            self.loop_monitor.start()
+
+        if settings.jobs_enabled:
+            self.job_pool.start()
+
+        if settings.prewarm_enabled:
+            self._prewarm_task = asyncio.create_task(self.prewarm_service.run_forever())
+
+        if settings.maintenance_interval > 0:
+            self._maintenance_task = asyncio.create_task(self._maintain_forever())
+
+    async def run_maintenance(self) -> Optional[Dict[str, int]]:
+        """Delete expired shared state and old jobs; one worker process does it per interval"""
+        if not await self.shared_state.try_lease("maintenance:purge", ttl=settings.maintenance_interval / 2):
+            return None
+        deleted = {"shared_state": await self.shared_state.purge_expired()}
+        if settings.jobs_enabled:
+            deleted["jobs"] = await self.job_queue.purge_finished(settings.job_retention)
+        return deleted
+
+    async def _maintain_forever(self):
+        while True:
+            await asyncio.sleep(settings.maintenance_interval)
+            try:
+                deleted = await self.run_maintenance()
+                if deleted:
+                    logger.info(f"Purged expired state: {deleted}")
+            except Exception as e:
+                logger.warning(f"Maintenance failed: {str(e)}")
+
+    async def warm(self):
+        """Open DB and upstream connections ahead of the first request"""
+        from sqlalchemy import text
+
+        try:
+            async with self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except Exception as e:
+            logger.warning(f"Database warm-up failed: {str(e)}")
+
+        try:
+            # Any response (even 401/404) leaves a keep-alive connection in the pool
+            # Warm the pool without building the OpenAI client, which stays lazy
+            base_url = os.environ.get("OPENAI_BASE_URL") or "https://api.openai.com/v1"
+            if self._openai_client is not None:
+                base_url = str(self._openai_client.base_url)
+            await self.http_client.head(base_url, timeout=settings.http_connect_timeout)
+        except Exception as e:
+            logger.warning(f"OpenAI connection warm-up failed: {str(e)}")
+
+    def request_started(self):
+        """Register an in-flight request"""
+        self._in_flight += 1
+        self._idle.clear()
+
+    def request_finished(self):
+        """Unregister an in-flight request"""
+        self._in_flight -= 1
+        if self._in_flight <= 0:
+            self._in_flight = 0
+            self._idle.set()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def metrics(self) -> dict:
+        """Runtime metrics of the resources built so far"""
+        return {
+            "in_flight": self._in_flight,
+            "admission": self._admission.metrics() if self._admission is not None else None,
+            "jobs": self._job_pool.metrics() if self._job_pool is not None else None,
+            "event_loop": self._loop_monitor.metrics() if self._loop_monitor is not None else None,
+            "openai": self._openai_service.metrics() if self._openai_service is not None else None,
+            "prewarm": self._prewarm_service.last_run if self._prewarm_service is not None else None
+        }
+
+    async def shutdown(self):
+        """Stop accepting work, drain in-flight requests and close clients"""
+        self.accepting = False
+
+        if self._in_flight:
+            logger.info(f"Draining {self._in_flight} in-flight request(s)...")
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=settings.shutdown_drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Drain timed out with {self._in_flight} request(s) still running")
+
+        if self._job_pool is not None:
+            await self._job_pool.stop()
+
+        for task in (self._prewarm_task, self._maintenance_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+        if self._loop_monitor is not None:
+            await self._loop_monitor.stop()
+
+        if self._openai_client is not None:
+            await self._openai_client.close()
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+        if self._engine is not None:
+            await self._engine.dispose()
+        if self._read_engine is not None:
+            await self._read_engine.dispose()
+        if self._shared_state is not None:
+            self._shared_state.close()
+        if self._job_queue is not None:
+            self._job_queue.close()
+
+        self._prewarm_task = None
+        self._maintenance_task = None
+        self._admission = None
+        self._job_pool = None
+        self._job_queue = None
+        self._loop_monitor = None
+        self._slow_requests = None
+        self._prewarm_service = None
+        self._openai_service = None
+        self._openai_client = None
+        self._http_client = None
+        self._session_factory = None
+        self._engine = None
+        self._read_session_factory = None
+        self._read_engine = None
+        self._shared_state = None
+
+# Create global instance
+resources = ResourceContainer()
+
+# Dependency to get database session
+async def get_db():
+    async with resources.session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+# Dependency to get a read replica session, None when reads share the primary session
+async def get_read_db():
+    if not resources.has_read_replica:
+        yield None
+        return
+    async with resources.read_session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
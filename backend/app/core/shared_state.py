@@ -0,0 +1,182 @@
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.sqlite_store import SQLiteStore
+
+class SharedState(SQLiteStore):
+    """
+    Host-local state shared by all worker processes.
+
+    Caches, rate limit buckets and in-flight leases live in a SQLite file,
+    so they are coordinated across uvicorn workers without any external
+    service.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cache (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS buckets (
+        name TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS leases (
+        key TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    # Cache
+
+    @staticmethod
+    def _cache_get(conn, key: str, now: float):
+        row = conn.execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _cache_set(conn, key: str, value: str, expires_at: float):
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, expires_at)
+        )
+
+    async def cache_get(self, key: str) -> Optional[Any]:
+        """Get a JSON value from the shared cache"""
+        value = await self._call(self._cache_get, key, time.time(), write=False)
+        return json.loads(value) if value is not None else None
+
+    async def cache_set(self, key: str, value: Any, ttl: float):
+        """Store a JSON-serializable value in the shared cache"""
+        await self._call(self._cache_set, key, json.dumps(value, ensure_ascii=False), time.time() + ttl)
+
+    @staticmethod
+    def _purge(conn, now: float) -> int:
+        deleted = conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,)).rowcount
+        deleted += conn.execute("DELETE FROM leases WHERE expires_at <= ?", (now,)).rowcount
+        return deleted
+
+    async def purge_expired(self) -> int:
+        """Delete expired cache entries and leases"""
+        return await self._call(self._purge, time.time())
+
+    # Rate limiting
+
+    @staticmethod
+    def _take_tokens(conn, name: str, rate: float, capacity: float, cost: float, now: float) -> float:
+        row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE name = ?", (name,)).fetchone()
+        tokens, updated_at = row if row else (capacity, now)
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+
+        if tokens >= cost:
+            tokens -= cost
+            wait = 0.0
+        else:
+            wait = (cost - tokens) / rate
+
+        conn.execute(
+            "INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+            (name, tokens, now)
+        )
+        return wait
+
+    async def acquire(self, name: str, rate: float, capacity: float, cost: float = 1.0, max_wait: float = 60.0):
+        """
+        Take tokens from a shared token bucket, sleeping until they are available.
+        rate is tokens per second; raises TimeoutError after max_wait seconds.
+        """
+        deadline = time.monotonic() + max_wait
+        while True:
+            wait = await self._call(self._take_tokens, name, rate, capacity, cost, time.time())
+            if wait <= 0:
+                return
+            if time.monotonic() + wait > deadline:
+                raise TimeoutError(f"Rate limit '{name}' not available within {max_wait}s")
+            await asyncio.sleep(wait)
+
+    # Single-flight leases
+
+    @staticmethod
+    def _try_lease(conn, key: str, owner: str, expires_at: float, now: float) -> bool:
+        row = conn.execute("SELECT owner, expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+        if row and row[1] > now and row[0] != owner:
+            return False
+        conn.execute(
+            "INSERT OR REPLACE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+            (key, owner, expires_at)
+        )
+        return True
+
+    @staticmethod
+    def _release_lease(conn, key: str, owner: str):
+        conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+    async def try_lease(self, key: str, ttl: float) -> bool:
+        """Try to become the only process working on key"""
+        now = time.time()
+        return await self._call(self._try_lease, key, self.owner, now + ttl, now)
+
+    async def release_lease(self, key: str):
+        """Release a lease held by this process"""
+        await self._call(self._release_lease, key, self.owner)
+
+    # Deduplicated computation
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: float,
+        lease_ttl: float = 120.0,
+        poll_interval: float = 0.2
+    ) -> Any:
+        """
+        Return the cached value for key, or compute it exactly once across
+        coroutines of this process and worker processes of this host.
+        compute must return a JSON-serializable value.
+        """
+        cached = await self.cache_get(key)
+        if cached is not None:
+            return cached
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._compute_once(key, compute, ttl, lease_ttl, poll_interval))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _compute_once(self, key, compute, ttl, lease_ttl, poll_interval):
+        lease_key = f"compute:{key}"
+        while True:
+            if await self.try_lease(lease_key, lease_ttl):
+                try:
+                    value = await compute()
+                    await self.cache_set(key, value, ttl)
+                    return value
+                finally:
+                    await self.release_lease(lease_key)
+
+            # Another worker is computing it, wait for its result
+            waited = 0.0
+            while waited < lease_ttl:
+                await asyncio.sleep(poll_interval)
+                waited += poll_interval
+                cached = await self.cache_get(key)
+                if cached is not None:
+                    return cached
+                if await self.try_lease(lease_key, lease_ttl):
+                    # The other worker gave up (error or crash), take over
+                    await self.release_lease(lease_key)
+                    break
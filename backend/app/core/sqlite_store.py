@@ -0,0 +1,63 @@
+import asyncio
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+class SQLiteStore:
+    """
+    Base for host-local stores in a SQLite file shared by worker processes.
+
+    The file runs in WAL mode, writes use IMMEDIATE transactions and
+    blocking calls run in a worker thread. Subclasses define SCHEMA.
+    """
+
+    SCHEMA = ""
+    ROW_FACTORY = None
+
+    def __init__(self, path: str):
+        self.path = path
+        self.owner = f"{os.getpid()}-{id(self)}"
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path,
+                timeout=10.0,
+                isolation_level=None,  # Explicit transactions only
+                check_same_thread=False
+            )
+            conn.row_factory = self.ROW_FACTORY
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _run(self, fn, *args, write: bool = True):
+        """Run fn(conn, *args), inside an IMMEDIATE transaction for writes"""
+        with self._lock:
+            conn = self._connect()
+            if not write:
+                return fn(conn, *args)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn, *args)
+                conn.execute("COMMIT")
+                return result
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    async def _call(self, fn, *args, write: bool = True):
+        return await asyncio.to_thread(self._run, fn, *args, write=write)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,30 +1,42 @@
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
 
-from app.core.database import engine
-from app.models import TravelRequest
-from app.core.config import settings
-from app.api.routes import recommendations_router
-from app.core.middleware import LoggingMiddleware
+from app.core.resources import resources
+from app.api.routes import recommendations_router, jobs_router, admin_router
+from app.core.middleware import (
+    LoggingMiddleware, DrainMiddleware, DeadlineMiddleware, ProfilingMiddleware, SettingsCORSMiddleware
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared clients on startup and release them on shutdown"""
+    await resources.startup()
+    try:
+        yield
+    finally:
+        await resources.shutdown()
+
 app = FastAPI(
     title="Travel Recommender API",
     description="API for generating travel recommendations using OpenAI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add middleware
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(DeadlineMiddleware)
+app.add_middleware(DrainMiddleware)
 app.add_middleware(LoggingMiddleware)
 
-# CORS middleware for frontend
+# CORS middleware for frontend, origins are read from settings on first use
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins,
+    SettingsCORSMiddleware,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -36,13 +48,17 @@ app.include_router(
     prefix="/api/v1/recommendations", 
     tags=["recommendations"]
 )
-
-@app.on_event("startup")
-async def startup():
-    """Initialize application on startup"""
-    # Create database tables
-    async with engine.begin() as conn:
-        await conn.run_sync(TravelRequest.metadata.create_all)
+app.include_router(
+    jobs_router,
+    prefix="/api/v1/jobs",
+    tags=["jobs"]
+)
+app.include_router(
+    admin_router,
+    prefix="/admin",
+    tags=["admin"],
+    include_in_schema=False
+)
 
 @app.get("/")
 async def root():
@@ -56,4 +72,9 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/metrics")
+async def metrics():
+    """Runtime metrics for tuning timeouts, hedging and autoscaling"""
+    return resources.metrics()
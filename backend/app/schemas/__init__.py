@@ -1,13 +1,18 @@
 from .travel import (
     Coordinates,
     Place,
+    RecommendationOutput,
     TravelRequestCreate,
     TravelRequestResponse
 )
+from .job import JobCreate, JobResponse
 
 __all__ = [
     "Coordinates",
     "Place", 
+    "RecommendationOutput",
     "TravelRequestCreate",
-    "TravelRequestResponse"
+    "TravelRequestResponse",
+    "JobCreate",
+    "JobResponse"
 ]
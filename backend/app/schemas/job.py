@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+from .travel import TravelRequestCreate, TravelRequestResponse
+
+class JobCreate(TravelRequestCreate):
+    callback_url: Optional[str] = None  # Receives the finished job as JSON
+
+class JobResponse(BaseModel):
+    id: str
+    status: str  # queued, running, succeeded, failed or cancelled
+    attempts: int
+    max_attempts: int
+    result: Optional[TravelRequestResponse] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
@@ -11,6 +11,11 @@ class Place(BaseModel):
     description: str
     coords: Coordinates
 
+class RecommendationOutput(BaseModel):
+    """Structured output expected from the model"""
+    places: List[Place]
+    exclusions: List[str] = []
+
 class TravelRequestCreate(BaseModel):
     text: str
     num_places: Optional[int] = 3
@@ -1,11 +1,18 @@
-from .openai_service import openai_service
+from .openai_service import OpenAIService
 from .recommendation_service import RecommendationService
 from .prompt_service import PromptService
 from .database_service import DatabaseService
+from .exclusion_service import ExclusionService, ExclusionSet
+from .prewarm_service import PrewarmService
+from .job_service import JobWorkerPool
 
 __all__ = [
-    "openai_service", 
+    "OpenAIService", 
     "RecommendationService", 
     "PromptService", 
-    "DatabaseService"
+    "DatabaseService",
+    "ExclusionService",
+    "ExclusionSet",
+    "PrewarmService",
+    "JobWorkerPool"
 ]
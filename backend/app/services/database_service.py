@@ -1,3 +1,4 @@
+import time
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
@@ -5,13 +6,36 @@ from datetime import datetime
 
 from app.models import TravelRequest
 from app.schemas import TravelRequestCreate
+from app.core.config import settings
 from app.core.exceptions import DatabaseError
 
+# id -> time.monotonic() of rows created by this process, read from the primary until replicas catch up
+_recent_writes: Dict[int, float] = {}
+
+def _remember_write(request_id: int):
+    now = time.monotonic()
+    for key, written_at in list(_recent_writes.items()):
+        if now - written_at > settings.read_your_writes_window:
+            del _recent_writes[key]
+    _recent_writes[request_id] = now
+
+def _recently_written(request_id: int) -> bool:
+    written_at = _recent_writes.get(request_id)
+    return written_at is not None and time.monotonic() - written_at <= settings.read_your_writes_window
+
 class DatabaseService:
     """Service for database operations"""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, read_db: Optional[AsyncSession] = None):
         self.db = db
+        # Read-only queries go to the replica session when one is given
+        self.read_db = read_db or db
+        self._wrote = False
+    
+    @property
+    def _reader(self) -> AsyncSession:
+        """Replica session, or the primary once this service has written (read-your-writes)"""
+        return self.db if self._wrote else self.read_db
     
     async def create_travel_request(
         self, 
@@ -31,6 +55,8 @@ class DatabaseService:
             self.db.add(db_request)
             await self.db.commit()
             await self.db.refresh(db_request)
+            self._wrote = True
+            _remember_write(db_request.id)
             return db_request
             
         except Exception as e:
@@ -38,19 +64,31 @@ class DatabaseService:
             raise DatabaseError(f"Failed to create travel request: {str(e)}")
     
     async def get_travel_request_by_id(self, request_id: int) -> Optional[TravelRequest]:
-        """Get travel request by ID"""
+        """Get travel request by ID, from the primary if it was just created"""
         try:
-            result = await self.db.execute(
-                select(TravelRequest).where(TravelRequest.id == request_id)
-            )
-            return result.scalar_one_or_none()
+            if self.read_db is self.db or _recently_written(request_id):
+                return await self._get_by_id(self.db, request_id)
+            
+            request = await self._get_by_id(self._reader, request_id)
+            if request is None:
+                # The replica may lag behind a write made by another worker
+                request = await self._get_by_id(self.db, request_id)
+            return request
             
         except Exception as e:
             raise DatabaseError(f"Failed to get travel request: {str(e)}")
     
+    @staticmethod
+    async def _get_by_id(session: AsyncSession, request_id: int) -> Optional[TravelRequest]:
+        result = await session.execute(
+            select(TravelRequest).where(TravelRequest.id == request_id)
+        )
+        return result.scalar_one_or_none()
+    
     async def get_recent_requests(self, limit: int = 5) -> List[Dict[str, Any]]:
         """Get recent requests for context building"""
         try:
+            # Conversation history feeds the next write, so it is read from the primary
             result = await self.db.execute(
                 select(TravelRequest)
                 .order_by(TravelRequest.created_at.desc())
@@ -71,6 +109,38 @@ class DatabaseService:
         except Exception as e:
             raise DatabaseError(f"Failed to get recent requests: {str(e)}")
     
+    async def get_requests_since(self, since: datetime, limit: int = 5000) -> List[Dict[str, Any]]:
+        """Get request texts created after a point in time for popularity mining"""
+        try:
+            result = await self._reader.execute(
+                select(TravelRequest.text, TravelRequest.exclude, TravelRequest.num_places)
+                .where(TravelRequest.created_at >= since)
+                .order_by(TravelRequest.created_at.desc())
+                .limit(limit)
+            )
+            
+            return [
+                {"text": text, "exclude": exclude, "num_places": num_places}
+                for text, exclude, num_places in result.all()
+            ]
+            
+        except Exception as e:
+            raise DatabaseError(f"Failed to get requests since {since}: {str(e)}")
+    
+    async def get_recent_answers(self, num_places: int, limit: int = 50) -> List[TravelRequest]:
+        """Get recent answered requests with the given number of places"""
+        try:
+            result = await self._reader.execute(
+                select(TravelRequest)
+                .where(TravelRequest.num_places == num_places)
+                .order_by(TravelRequest.created_at.desc())
+                .limit(limit)
+            )
+            return result.scalars().all()
+            
+        except Exception as e:
+            raise DatabaseError(f"Failed to get recent answers: {str(e)}")
+    
     async def get_all_travel_requests(
         self, 
         limit: int = 10, 
@@ -78,7 +148,7 @@ class DatabaseService:
     ) -> List[TravelRequest]:
         """Get all travel requests with pagination"""
         try:
-            result = await self.db.execute(
+            result = await self._reader.execute(
                 select(TravelRequest)
                 .order_by(TravelRequest.created_at.desc())
                 .limit(limit)
@@ -92,12 +162,13 @@ class DatabaseService:
     async def delete_travel_request(self, request_id: int) -> bool:
         """Delete travel request"""
         try:
-            request = await self.get_travel_request_by_id(request_id)
+            request = await self._get_by_id(self.db, request_id)
             if not request:
                 return False
             
             await self.db.delete(request)
             await self.db.commit()
+            self._wrote = True
             return True
             
         except Exception as e:
@@ -108,21 +179,21 @@ class DatabaseService:
         """Get database statistics"""
         try:
             # Total requests
-            total_result = await self.db.execute(
+            total_result = await self._reader.execute(
                 select(func.count(TravelRequest.id))
             )
             total_requests = total_result.scalar()
             
             # Requests today
             today = datetime.now().date()
-            today_result = await self.db.execute(
+            today_result = await self._reader.execute(
                 select(func.count(TravelRequest.id))
                 .where(func.date(TravelRequest.created_at) == today)
             )
             today_requests = today_result.scalar()
             
             # Average places per request
-            avg_result = await self.db.execute(
+            avg_result = await self._reader.execute(
                 select(func.avg(TravelRequest.num_places))
             )
             avg_places = avg_result.scalar()
@@ -139,7 +210,7 @@ class DatabaseService:
     async def search_requests(self, search_term: str, limit: int = 10) -> List[TravelRequest]:
         """Search travel requests by text"""
         try:
-            result = await self.db.execute(
+            result = await self._reader.execute(
                 select(TravelRequest)
                 .where(TravelRequest.text.ilike(f"%{search_term}%"))
                 .order_by(TravelRequest.created_at.desc())
@@ -0,0 +1,244 @@
+import hashlib
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.services.place_aliases import PLACE_ALIASES
+
+_CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "h", "ґ": "g", "д": "d", "е": "e", "є": "ie",
+    "ж": "zh", "з": "z", "и": "y", "і": "i", "ї": "i", "й": "i", "к": "k", "л": "l",
+    "м": "m", "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch", "ь": "", "ю": "iu",
+    "я": "ia", "ё": "e", "ъ": "", "ы": "y", "э": "e"
+}
+
+# Articles and prepositions that do not identify a place
+_STOPWORDS = {
+    "the", "a", "an", "of", "to", "il", "lo", "la", "le", "les", "el", "los", "las", "l",
+    "di", "del", "della", "de", "du", "des", "der", "die", "das", "von", "v", "u", "na", "do"
+}
+
+# Phrases that introduce places the user does not want (uk, ru, en, es, fr, it, de)
+_TRIGGERS = [
+    r"не\s+(?:хочу|хочемо|хотим|хочеться|хочется|треба|надо|потрібно|нужно)",
+    r"не\s+(?:показуй|показуйте|пропонуй|пропонуйте|предлагай|предлагайте|рекомендуй|рекомендуйте)",
+    r"(?:виключи|виключіть|исключи|исключите|прибери|приберіть|убери|уберите)",
+    # "крім того" / "кроме того" mean "besides", not "except"
+    r"(?:крім|кроме)(?!\s+(?:того|цього|этого|всього|всего)(?!\w))",
+    r"(?:don'?t|do\s+not|doesn'?t|won'?t)\s+(?:want|wanna|like|need|show|recommend|include)",
+    r"not\s+interested\s+in",
+    r"(?:skip|exclude|avoid|except)",
+    r"no\s+(?:quiero|queremos|me\s+interesa|muestres|recomiendes)",
+    r"(?:excepto|evita|evitar)",
+    r"(?:je\s+)?ne\s+(?:veux|voulons|souhaite)\s+pas",
+    r"(?:sauf|évite|éviter)",
+    r"non\s+(?:voglio|vogliamo|mi\s+interessa)",
+    r"(?:tranne|evitare)",
+    r"(?:ich\s+)?(?:will|möchte|moechte|wollen)\s+nicht",
+    r"außer"
+]
+
+# Verbs and prepositions between the trigger and the place name
+_FILLERS = (
+    r"to|go|going|visit|visiting|see|seeing|into|in|at|the|"
+    r"в|у|до|на|йти|іти|идти|їхати|ехать|відвідувати|посещать|бачити|видеть|ще|еще|більше|больше|"
+    r"ir|a|al|visitar|ver|aller|à|au|aux|visiter|voir|andare|alla|allo|ai|visitare|vedere|"
+    r"zu|zum|zur|den|dem|besuchen|sehen|nach"
+)
+
+_EXCLUSION_PATTERN = re.compile(
+    r"(?<!\w)(?:" + "|".join(_TRIGGERS) + r")(?!\w)"
+    r"(?:\s+(?:" + _FILLERS + r")(?!\w))*"
+    r"\s*(?P<target>[^.;!?\n]+)",
+    re.IGNORECASE | re.UNICODE
+)
+
+# Clause boundaries after which the user talks about something else
+_CLAUSE_BREAK = re.compile(r"(?<!\w)(?:але|а|но|проте|but|however|pero|mais|ma|però|aber|sondern)(?!\w)", re.IGNORECASE)
+
+# Pronouns and verbs: a phrase containing them is a clause, not a place name
+_CLAUSE_WORDS = (
+    r"i|me|my|we|us|our|you|your|he|she|it|they|them|am|is|are|was|were|be|want|wanna|like|love|"
+    r"need|prefer|show|give|tell|let|go|see|visit|can|could|will|would|"
+    r"я|ми|мы|ти|ты|він|вона|вони|он|она|они|мені|мне|нам|хочу|хочемо|хотим|люблю|любим|"
+    r"покажи|покажіть|покажите|дай|дайте|є|есть|"
+    r"yo|quiero|muéstrame|je|j|veux|aime|montre|io|voglio|mostrami|ich|will|möchte|mag|zeig"
+)
+_CLAUSE_WORD = re.compile(r"(?<!\w)(?:" + _CLAUSE_WORDS + r")(?!\w)", re.IGNORECASE)
+
+# A comma followed by a pronoun or verb starts a new clause: "Skip Rome, show me Paris"
+_NEW_CLAUSE = re.compile(r",\s*(?=(?:" + _CLAUSE_WORDS + r")(?!\w))", re.IGNORECASE)
+
+# Politeness and filler words after the place name
+_TRAILING_FILLER = re.compile(
+    r"(?:\s+(?:please|pls|plz|too|also|either|thanks|будь\s+ласка|пожалуйста|плиз|теж|також|тоже|"
+    r"por\s+favor|s'il\s+vous\s+plaît|per\s+favore|bitte|auch))+$",
+    re.IGNORECASE
+)
+
+# Separators inside a list of excluded places
+_LIST_SEPARATOR = re.compile(
+    r",|(?<!\w)(?:і|й|та|и|або|или|and|or|nor|y|o|ni|et|ou|e|und|oder|ще)(?!\w)",
+    re.IGNORECASE
+)
+
+_LEADING_FILLER = re.compile(
+    r"^(?:(?:" + _FILLERS + r"|la|le|les|l'|il|lo|el|los|las|der|die|das)(?!\w)\s*)+",
+    re.IGNORECASE
+)
+
+_MAX_PLACE_WORDS = 6
+_MAX_PROPER_NAME_WORDS = 4
+
+def normalize_place_name(name: str) -> str:
+    """Casefold, strip accents and punctuation, transliterate and drop articles"""
+    text = unicodedata.normalize("NFKD", name.casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = "".join(_CYRILLIC_TO_LATIN.get(ch, ch) for ch in text)
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(token for token in text.split() if token not in _STOPWORDS)
+
+def _similar(a: str, b: str) -> bool:
+    return SequenceMatcher(None, a, b).ratio() >= 0.85
+
+# Normalized alias -> canonical place key, built once
+_ALIAS_INDEX: Dict[str, str] = {
+    normalize_place_name(alias): key
+    for key, aliases in PLACE_ALIASES.items()
+    for alias in aliases
+}
+
+def _build_group_tokens() -> Dict[str, List[frozenset]]:
+    """Canonical place key -> token sets of all its normalized aliases"""
+    groups: Dict[str, List[frozenset]] = {}
+    for alias, key in _ALIAS_INDEX.items():
+        groups.setdefault(key, []).append(frozenset(alias.split()))
+    return groups
+
+_GROUP_TOKENS = _build_group_tokens()
+
+def _is_proper_name(item: str) -> bool:
+    """Short phrase of capitalised words (articles aside) without pronouns or verbs"""
+    words = item.split()
+    if len(words) > _MAX_PROPER_NAME_WORDS or _CLAUSE_WORD.search(item):
+        return False
+    for word in words:
+        word = word.strip(".,'’\"()")
+        if word and not (word[0].isupper() or word[0].isdigit() or normalize_place_name(word) == ""):
+            return False
+    return True
+
+def _looks_like_place(item: str) -> bool:
+    """A known place alias ("не хочу в колізей") or a short proper name"""
+    return ExclusionService.canonical(item) in _GROUP_TOKENS or _is_proper_name(item)
+
+def _key_hash(key: str) -> int:
+    """Compact 64-bit hash of a canonical place key"""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+class ExclusionSet:
+    """
+    Accumulated exclusions of a conversation with O(1) membership checks.
+
+    Names are stored under the hash of their canonical key, so aliases of
+    the same place collapse into one entry. Alias token sets are indexed by
+    their longest token: matching a place costs a lookup per word of the
+    place name instead of a scan over every exclusion.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._names: Dict[int, str] = {}
+        self._by_token: Dict[str, List[Tuple[frozenset, str]]] = {}
+        self.add(names)
+
+    def add(self, names: Iterable[str]) -> List[str]:
+        """Add exclusions; returns only the ones that were not excluded yet"""
+        added = []
+        for name in names:
+            if not isinstance(name, str) or not name.strip():
+                continue
+            name = name.strip()
+            key = ExclusionService.canonical(name)
+            key_hash = _key_hash(key)
+            if key_hash in self._names:
+                continue
+            self._names[key_hash] = name
+            added.append(name)
+
+            # "Колізей" also excludes "Colosseum Underground Tour"
+            for tokens in _GROUP_TOKENS.get(key) or [frozenset(key.split())]:
+                if tokens and max(map(len, tokens)) >= 4:
+                    anchor = max(tokens, key=len)
+                    self._by_token.setdefault(anchor, []).append((tokens, name))
+        return added
+
+    def match(self, place_name: str) -> Optional[str]:
+        """Return the exclusion a place name violates, if any"""
+        name = self._names.get(_key_hash(ExclusionService.canonical(place_name)))
+        if name is not None:
+            return name
+
+        place_tokens = set(normalize_place_name(place_name).split())
+        for token in place_tokens:
+            for tokens, name in self._by_token.get(token, ()):
+                if tokens <= place_tokens:
+                    return name
+        return None
+
+    def names(self) -> List[str]:
+        """Exclusions in the order they were added, first spelling kept"""
+        return list(self._names.values())
+
+    def __contains__(self, name: str) -> bool:
+        return _key_hash(ExclusionService.canonical(name.strip())) in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names.values())
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+class ExclusionService:
+    """Rule-based, multilingual handling of places the user does not want"""
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def canonical(name: str) -> str:
+        """Stable key for a place name: known alias group or its normalized form"""
+        normalized = normalize_place_name(name)
+        if normalized in _ALIAS_INDEX:
+            return _ALIAS_INDEX[normalized]
+
+        for alias, key in _ALIAS_INDEX.items():
+            if _similar(normalized, alias):
+                return key
+        return normalized
+
+    @staticmethod
+    def extract(text: str) -> List[str]:
+        """Extract excluded places from a message without calling the model"""
+        found = []
+        for match in _EXCLUSION_PATTERN.finditer(text):
+            target = _CLAUSE_BREAK.split(match.group("target"))[0]
+            target = _NEW_CLAUSE.split(target)[0]
+            for item in _LIST_SEPARATOR.split(target):
+                item = _LEADING_FILLER.sub("", item.strip()).strip(" \"'«»“”")
+                item = _TRAILING_FILLER.sub("", item).strip(" \"'«»“”")
+                if (
+                    item
+                    and len(item.split()) <= _MAX_PLACE_WORDS
+                    and normalize_place_name(item)
+                    and _looks_like_place(item)
+                ):
+                    found.append(item)
+        return ExclusionService.merge([], found)
+
+    @staticmethod
+    def merge(existing: Iterable[str], new: Iterable[str]) -> List[str]:
+        """Alias-aware union preserving order and the first spelling seen"""
+        merged = ExclusionSet(existing)
+        merged.add(new)
+        return merged.names()
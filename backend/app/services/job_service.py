@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+from urllib.parse import urlparse
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.deadline import deadline_scope
+from app.core.job_queue import JobQueue
+from app.core.shared_state import SharedState
+from app.schemas import TravelRequestCreate
+from app.services.database_service import DatabaseService
+from app.services.openai_service import OpenAIService
+from app.services.recommendation_service import RecommendationService
+
+logger = logging.getLogger(__name__)
+
+def is_allowed_callback(url: str) -> bool:
+    """Callbacks may only target configured (local by default) hosts"""
+    parsed = urlparse(url)
+    return parsed.scheme in ("http", "https") and parsed.hostname in settings.job_callback_allowed_hosts
+
+class JobWorkerPool:
+    """Asyncio workers that run queued recommendation jobs in this process"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        session_factory,
+        openai_service: Union[OpenAIService, Callable[[], OpenAIService], None],
+        shared_state: Optional[SharedState] = None,
+        http_client=None,
+        concurrency: int = 2
+    ):
+        self.queue = queue
+        self.session_factory = session_factory
+        # Clients may be given as callables that build them when the first job needs them
+        self._openai_service = openai_service
+        self.shared_state = shared_state
+        self._http_client = http_client
+        self.concurrency = concurrency
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancelled: Set[str] = set()
+        self._wakeup = asyncio.Event()
+        self.stats = {"succeeded": 0, "failed": 0, "retried": 0, "cancelled": 0, "callbacks_failed": 0}
+
+    @property
+    def openai_service(self) -> OpenAIService:
+        if callable(self._openai_service):
+            self._openai_service = self._openai_service()
+        return self._openai_service
+
+    @property
+    def http_client(self):
+        if callable(self._http_client):
+            self._http_client = self._http_client()
+        return self._http_client
+
+    def start(self):
+        for _ in range(self.concurrency):
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def stop(self):
+        """Stop the workers; running jobs go back to the queue"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def notify(self):
+        """Wake idle workers after a submit"""
+        self._wakeup.set()
+
+    def cancel_local(self, job_id: str):
+        """Stop a cancelled job right away if this process is running it"""
+        task = self._running.get(job_id)
+        if task is not None:
+            self._cancelled.add(job_id)
+            task.cancel()
+
+    async def _worker(self):
+        while True:
+            try:
+                job = await self.queue.claim(lease_ttl=settings.job_timeout + 30)
+            except Exception as e:
+                logger.warning(f"Claiming a job failed: {str(e)}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), settings.job_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            try:
+                await self._process(job)
+            except Exception as e:
+                # The job's lease expires and another worker retries it
+                logger.warning(f"Processing job {job['id']} failed: {str(e)}")
+
+    async def _process(self, job: Dict[str, Any]):
+        job_id = job["id"]
+        task = asyncio.ensure_future(self._handle(job["payload"]))
+        self._running[job_id] = task
+        try:
+            await self._wait_unless_cancelled(job_id, task)
+            result = await task
+        except asyncio.CancelledError:
+            if job_id in self._cancelled:
+                self._cancelled.discard(job_id)
+                self.stats["cancelled"] += 1
+                return
+            # The pool is stopping, let another worker pick the job up
+            task.cancel()
+            await self.queue.requeue(job_id)
+            raise
+        except Exception as e:
+            delay = settings.job_retry_delay * 2 ** (job["attempts"] - 1)
+            failed = await self.queue.fail(job_id, str(e), retry_delay=delay)
+            if failed is None:
+                self.stats["cancelled"] += 1
+            elif failed["status"] == "failed":
+                self.stats["failed"] += 1
+                logger.warning(f"Job {job_id} failed after {failed['attempts']} attempt(s): {str(e)}")
+                await self._send_callback(failed)
+            else:
+                self.stats["retried"] += 1
+            return
+        finally:
+            self._running.pop(job_id, None)
+
+        if await self.queue.complete(job_id, result):
+            self.stats["succeeded"] += 1
+            await self._send_callback(await self.queue.get(job_id))
+        else:
+            self.stats["cancelled"] += 1
+
+    async def _wait_unless_cancelled(self, job_id: str, task: asyncio.Task):
+        """Wait for the job, stopping it if it gets cancelled from any process"""
+        while not task.done():
+            await asyncio.wait({task}, timeout=settings.job_cancel_check_interval)
+            if task.done():
+                return
+            current = await self.queue.get(job_id)
+            if current is None or current["status"] != "running" or current["locked_by"] != self.queue.owner:
+                self.cancel_local(job_id)
+                await asyncio.wait({task})
+
+    async def _handle(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one recommendation job with its own session and deadline"""
+        async with self.session_factory() as session:
+            service = RecommendationService(DatabaseService(session), self.openai_service, self.shared_state)
+            with deadline_scope(settings.job_timeout):
+                result = await service.create_recommendations(TravelRequestCreate(**payload))
+        return jsonable_encoder(result)
+
+    async def _send_callback(self, job: Optional[Dict[str, Any]]):
+        if job is None or not job["callback_url"] or self._http_client is None:
+            return
+        try:
+            response = await self.http_client.post(
+                job["callback_url"],
+                json={"id": job["id"], "status": job["status"], "result": job["result"], "error": job["error"]},
+                timeout=10.0
+            )
+            response.raise_for_status()
+        except Exception as e:
+            self.stats["callbacks_failed"] += 1
+            logger.warning(f"Callback for job {job['id']} failed: {str(e)}")
+
+    def metrics(self) -> Dict[str, Any]:
+        live = sum(1 for worker in self._workers if not worker.done())
+        return {"workers": live, "running": len(self._running), **self.stats}
@@ -0,0 +1,119 @@
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.latency import LatencyTracker
+
+class ModelRoute:
+    """A model served by a specific OpenAI-compatible client"""
+
+    def __init__(self, model: str, client: Any, provider: str = "openai"):
+        self.model = model
+        self.client = client
+        self.provider = provider
+
+    @property
+    def key(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+class _RouteStats:
+    def __init__(self):
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.errors = 0
+        self.recent_errors = deque(maxlen=20)
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+
+class ModelRouter:
+    """Picks a model per request and records per-model latency, cost and errors"""
+
+    def __init__(
+        self,
+        primary: ModelRoute,
+        fast: Optional[ModelRoute] = None,
+        fallbacks: Optional[List[ModelRoute]] = None
+    ):
+        self.primary = primary
+        self.fast = fast
+        self.fallbacks = fallbacks or []
+        self._stats: Dict[str, _RouteStats] = {}
+
+    def _stats_for(self, route: ModelRoute) -> _RouteStats:
+        if route.key not in self._stats:
+            self._stats[route.key] = _RouteStats()
+        return self._stats[route.key]
+
+    def _is_unhealthy(self, route: ModelRoute) -> bool:
+        """Recent error rate above the threshold"""
+        recent = self._stats_for(route).recent_errors
+        return len(recent) >= 5 and sum(recent) / len(recent) > settings.route_max_error_rate
+
+    def choose(self, text: str, has_history: bool, num_places: int) -> List[ModelRoute]:
+        """
+        Ordered routes to try: the selected model first, then fallbacks.
+        Short refinements of an existing conversation go to the fast model.
+        """
+        candidates = [self.primary]
+        if (
+            self.fast is not None
+            and has_history
+            and len(text.strip()) <= settings.route_fast_max_chars
+            and num_places <= settings.route_fast_max_places
+        ):
+            candidates.insert(0, self.fast)
+        candidates.extend(self.fallbacks)
+        return self._ordered(candidates)
+
+    def fallback_order(self, key: Optional[str] = None) -> List[ModelRoute]:
+        """The route with this key first, then the primary and fallbacks"""
+        served = [r for r in [self.fast, self.primary] + self.fallbacks if r is not None and r.key == key]
+        return self._ordered(served[:1] + [self.primary] + self.fallbacks)
+
+    def _ordered(self, candidates: List[ModelRoute]) -> List[ModelRoute]:
+        routes = []
+        seen = set()
+        for route in candidates:
+            if route.key not in seen:
+                seen.add(route.key)
+                routes.append(route)
+
+        # Keep unhealthy routes only as a last resort
+        return [r for r in routes if not self._is_unhealthy(r)] + [r for r in routes if self._is_unhealthy(r)]
+
+    def record_success(self, route: ModelRoute, seconds: float, usage: Any = None):
+        stats = self._stats_for(route)
+        stats.calls += 1
+        stats.recent_errors.append(0)
+        stats.latency.record(seconds)
+
+        if usage is not None:
+            prompt_tokens = usage.prompt_tokens or 0
+            completion_tokens = usage.completion_tokens or 0
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            input_price, output_price = settings.openai_model_prices.get(route.model, (0.0, 0.0))
+            stats.cost_usd += (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+    def record_error(self, route: ModelRoute):
+        stats = self._stats_for(route)
+        stats.calls += 1
+        stats.errors += 1
+        stats.recent_errors.append(1)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Per-model latency, cost and error rate"""
+        return {
+            key: {
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "error_rate": round(stats.errors / stats.calls, 3) if stats.calls else None,
+                "latency": stats.latency.snapshot(),
+                "prompt_tokens": stats.prompt_tokens,
+                "completion_tokens": stats.completion_tokens,
+                "cost_usd": round(stats.cost_usd, 6),
+                "avg_cost_usd": round(stats.cost_usd / stats.calls, 6) if stats.calls else None
+            }
+            for key, stats in self._stats.items()
+        }
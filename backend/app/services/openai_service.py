@@ -1,89 +1,388 @@
 import os
-import json
+import re
 import asyncio
-from typing import List, Optional, Tuple
-from openai import AsyncOpenAI
-from openai import RateLimitError, APITimeoutError, APIError
-from app.schemas import Place, Coordinates
+import hashlib
+import time
+from typing import List, Optional, Tuple, TYPE_CHECKING
+from app.schemas import Place
 from app.core.config import settings
+from app.core.shared_state import SharedState
+from app.core.latency import LatencyTracker
+from app.core.deadline import remaining, check_deadline
 from app.services.prompt_service import PromptService
-from app.core.exceptions import OpenAIError
+from app.services.response_parser import parse_recommendations, RESPONSE_SCHEMA
+from app.services.token_counter import count_tokens
+from app.services.model_router import ModelRouter, ModelRoute
+from app.core.exceptions import OpenAIError, DeadlineExceededError
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+def normalize_request_text(text: str) -> str:
+    """Casefold and drop punctuation so equivalent request texts share a key"""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.casefold()).split())
 
 class OpenAIService:
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+    def __init__(
+        self,
+        client: Optional["AsyncOpenAI"] = None,
+        shared_state: Optional[SharedState] = None,
+        fallback_client: Optional["AsyncOpenAI"] = None
+    ):
+        # The client is normally injected by the lifespan-managed resource container
+        if client is None:
+            from openai import AsyncOpenAI
+            client = AsyncOpenAI(api_key=settings.openai_api_key, max_retries=0)
+        self.client = client
+        self.shared_state = shared_state
         self.model = settings.openai_model
+        self.router = self._build_router(client, fallback_client)
         self.prompt_service = PromptService()
+        self.latency = LatencyTracker()
+        self.stats = {"calls": 0, "timeouts": 0, "hedged": 0, "hedge_wins": 0, "primary_wins": 0, "repaired": 0, "prewarm_hits": 0}
+        self.token_stats = {"prompt_tokens_estimated": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0}
+
+    @staticmethod
+    def _build_router(client: "AsyncOpenAI", fallback_client: Optional["AsyncOpenAI"]) -> ModelRouter:
+        """Primary, fast-path and fallback routes from settings"""
+        primary = ModelRoute(settings.openai_model, client)
+        fast = ModelRoute(settings.openai_fast_model, client) if settings.openai_fast_model else None
+        fallbacks = [ModelRoute(model, client) for model in settings.openai_fallback_models]
+        if fallback_client is not None and settings.fallback_provider_model:
+            fallbacks.append(ModelRoute(settings.fallback_provider_model, fallback_client, provider="fallback"))
+        return ModelRouter(primary, fast, fallbacks)
+
+    @property
+    def system_prompt_tokens(self) -> int:
+        """Tokens of the system prompt, counted on first use rather than at startup"""
+        return count_tokens(self.prompt_service.get_system_prompt(), self.model)
+
+    def _cache_key(self, user_request: str, num_places: int, route: ModelRoute) -> str:
+        """Cache key covering everything that is sent to the model"""
+        prompt = self.prompt_service.generate_recommendation_prompt(user_request, num_places)
+        payload = "\x00".join([route.key, self.prompt_service.get_system_prompt(), prompt])
+        return "recommendations:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _prewarm_key(self, text: str, num_places: int) -> str:
+        """Cache key of a pre-warmed answer for a fresh request text"""
+        route = self.router.choose(text, False, num_places)[0]
+        payload = "\x00".join([
+            route.key, self.prompt_service.get_system_prompt(), str(num_places), normalize_request_text(text)
+        ])
+        return "prewarm:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get_prewarmed(self, text: str, num_places: int) -> Optional[List[Place]]:
+        """Pre-warmed places for a request text that starts a new trip, if any"""
+        if self.shared_state is None:
+            return None
+        data = await self.shared_state.cache_get(self._prewarm_key(text, num_places))
+        if data is None:
+            return None
+        self.stats["prewarm_hits"] += 1
+        return [Place(**place) for place in data]
+
+    async def is_prewarmed(self, text: str, num_places: int) -> bool:
+        if self.shared_state is None:
+            return False
+        return await self.shared_state.cache_get(self._prewarm_key(text, num_places)) is not None
+
+    async def prewarm(self, text: str, num_places: int, ttl: float) -> List[Place]:
+        """Generate places for a request text as if it had no history and cache them"""
+        routes = self.router.choose(text, False, num_places)
+        places, _, _ = await self._generate_routed(f"Current message: {text}", num_places, 2, routes)
+        if self.shared_state is not None:
+            await self.shared_state.cache_set(
+                self._prewarm_key(text, num_places), [place.dict() for place in places], ttl
+            )
+        return places
+
+    def estimate_cost(self, text: str, num_places: int, completion_tokens_per_place: int) -> float:
+        """Rough USD cost of generating places for a fresh request text"""
+        route = self.router.choose(text, False, num_places)[0]
+        prompt = self.prompt_service.generate_recommendation_prompt(f"Current message: {text}", num_places)
+        prompt_tokens = self.system_prompt_tokens + count_tokens(prompt, route.model)
+        completion_tokens = num_places * completion_tokens_per_place
+        input_price, output_price = settings.openai_model_prices.get(route.model, (0.0, 0.0))
+        return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+    async def _throttle(self):
+        """Wait for a slot in the host-wide OpenAI request budget"""
+        if self.shared_state is None or settings.openai_requests_per_minute <= 0:
+            return
+        await self.shared_state.acquire(
+            "openai",
+            rate=settings.openai_requests_per_minute / 60.0,
+            capacity=settings.openai_burst
+        )
+
+    def _attempt_timeout(self) -> float:
+        """Per-attempt timeout from observed p99, bounded by the request deadline"""
+        timeout = settings.openai_timeout_max
+        if self.latency.count >= settings.openai_latency_min_samples:
+            adaptive = self.latency.percentile(0.99) * settings.openai_timeout_multiplier
+            timeout = min(settings.openai_timeout_max, max(settings.openai_timeout_min, adaptive))
+        
+        check_deadline("OpenAI call")
+        left = remaining()
+        if left is not None:
+            timeout = min(timeout, left)
+        return timeout
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Delay before a hedged attempt, None when hedging is off or over budget"""
+        if not settings.openai_hedging_enabled:
+            return None
+        if self.latency.count < settings.openai_latency_min_samples:
+            return None
+        # Cost cap: at most openai_hedge_max_ratio of calls may pay for a second attempt
+        if self.stats["hedged"] + 1 > settings.openai_hedge_max_ratio * self.stats["calls"]:
+            return None
+        return self.latency.percentile(settings.openai_hedge_percentile)
+
+    async def _create_completion(self, route: ModelRoute, **kwargs):
+        """Call the chat completions API with an adaptive timeout and optional hedging"""
+        from openai import APITimeoutError
+        
+        timeout = self._attempt_timeout()
+        self.stats["calls"] += 1
+        delay = self._hedge_delay()
+        started = time.monotonic()
+        kwargs["model"] = route.model
+        
+        try:
+            if delay is None or delay >= timeout:
+                response = await route.client.chat.completions.create(timeout=timeout, **kwargs)
+            else:
+                response = await self._create_hedged(route, kwargs, timeout, delay)
+        except APITimeoutError:
+            self.stats["timeouts"] += 1
+            self.router.record_error(route)
+            raise
+        except Exception:
+            self.router.record_error(route)
+            raise
+        
+        elapsed = time.monotonic() - started
+        self.latency.record(elapsed)
+        self.router.record_success(route, elapsed, getattr(response, "usage", None))
+        return response
+
+    async def _create_hedged(self, route: ModelRoute, kwargs: dict, timeout: float, delay: float):
+        """Start a second attempt after delay and return whichever finishes first"""
+        primary = asyncio.ensure_future(route.client.chat.completions.create(timeout=timeout, **kwargs))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+            
+            await self._throttle()
+            self.stats["hedged"] += 1
+            hedge = asyncio.ensure_future(
+                route.client.chat.completions.create(timeout=max(timeout - delay, 0.1), **kwargs)
+            )
+            tasks.add(hedge)
+            
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.stats["hedge_wins" if task is hedge else "primary_wins"] += 1
+                        return task.result()
+            
+            # Both attempts failed, surface the primary error
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _record_usage(self, prompt: str, response):
+        """Accumulate local prompt token estimates and billed usage"""
+        self.token_stats["prompt_tokens_estimated"] += self.system_prompt_tokens + count_tokens(prompt, self.model)
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        self.token_stats["prompt_tokens"] += usage.prompt_tokens or 0
+        self.token_stats["completion_tokens"] += usage.completion_tokens or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        if details is not None:
+            self.token_stats["cached_prompt_tokens"] += details.cached_tokens or 0
+
+    def metrics(self) -> dict:
+        """Latency, timeout, hedging and token metrics"""
+        hedged = self.stats["hedged"]
+        return {
+            "latency": self.latency.snapshot(),
+            **self.stats,
+            "hedge_win_rate": round(self.stats["hedge_wins"] / hedged, 3) if hedged else None,
+            "tokens": {
+                **self.token_stats,
+                "system_prompt_tokens": self.system_prompt_tokens
+            },
+            "models": self.router.metrics()
+        }
 
     async def generate_recommendations(
         self, 
         user_request: str, 
         num_places: int = 3,
-        max_retries: int = 2
+        max_retries: int = 2,
+        current_text: Optional[str] = None,
+        has_history: bool = False
+    ) -> Tuple[List[Place], List[str], str]:
+        """
+        Generate travel recommendations and extract exclusions based on user request.
+        The model is picked from the current message, history and num_places,
+        falling back to other models on errors. Identical requests are served
+        from the shared cache and computed once across all worker processes.
+        Returns: (places, exclusions, key of the route that served the answer)
+        """
+        routes = self.router.choose(current_text or user_request, has_history, num_places)
+        
+        if self.shared_state is None or settings.recommendation_cache_ttl <= 0:
+            return await self._generate_routed(user_request, num_places, max_retries, routes)
+        
+        async def compute():
+            places, exclusions, route_key = await self._generate_routed(user_request, num_places, max_retries, routes)
+            return {"places": [place.dict() for place in places], "exclusions": exclusions, "route": route_key}
+        
+        try:
+            data = await self.shared_state.get_or_compute(
+                self._cache_key(user_request, num_places, routes[0]),
+                compute,
+                ttl=settings.recommendation_cache_ttl
+            )
+        except (OpenAIError, DeadlineExceededError):
+            raise
+        except Exception as e:
+            raise OpenAIError(f"Error generating recommendations: {str(e)}")
+        
+        return [Place(**place) for place in data["places"]], data["exclusions"], data.get("route", routes[0].key)
+
+    def _response_format(self) -> dict:
+        """Strict JSON schema when the model supports structured outputs"""
+        if settings.openai_structured_outputs:
+            return {"type": "json_schema", "json_schema": RESPONSE_SCHEMA}
+        return {"type": "json_object"}
+
+    async def _generate_routed(
+        self,
+        user_request: str,
+        num_places: int,
+        max_retries: int,
+        routes: List[ModelRoute]
+    ) -> Tuple[List[Place], List[str], str]:
+        """Try each route in order until one succeeds"""
+        last_error = None
+        for route in routes:
+            try:
+                places, exclusions = await self._generate(user_request, num_places, max_retries, route)
+                return places, exclusions, route.key
+            except OpenAIError as e:
+                last_error = e
+                print(f"Model {route.key} failed, trying next route: {e.detail}")
+        raise last_error
+
+    async def _generate(
+        self, 
+        user_request: str, 
+        num_places: int = 3,
+        max_retries: int = 2,
+        route: Optional[ModelRoute] = None
     ) -> Tuple[List[Place], List[str]]:
+        """Generate places, topping up a shortfall with a smaller follow-up request"""
+        route = route or self.router.primary
+        # Generate prompt using PromptService
+        prompt = self.prompt_service.generate_recommendation_prompt(
+            user_request, num_places
+        )
+        places, exclusions = await self._complete(prompt, max_retries, route)
+        
+        # Validate that we got the expected number of places
+        if len(places) < num_places:
+            missing = num_places - len(places)
+            print(f"Warning: Expected {num_places} places, but got {len(places)}. Requesting {missing} more...")
+            places.extend(await self.generate_additional_places(
+                user_request, missing, [place.name for place in places],
+                max_retries=max_retries, route=route
+            ))
+        
+        # Never return (and so never cache or persist) an empty or short answer
+        if len(places) < num_places:
+            raise OpenAIError(f"Model {route.key} returned {len(places)} valid place(s), expected {num_places}")
+        
+        return places[:num_places], exclusions
+
+    async def generate_additional_places(
+        self,
+        user_request: str,
+        count: int,
+        avoid: List[str],
+        exclude: Optional[List[str]] = None,
+        max_retries: int = 2,
+        route: Optional[ModelRoute] = None,
+        served_by: Optional[str] = None
+    ) -> List[Place]:
         """
-        Generate travel recommendations and extract exclusions based on user request
-        Returns: (places, exclusions)
+        Ask only for the missing places instead of regenerating the whole answer.
+        Uses the given route, or the route that served the answer (served_by)
+        followed by the router's fallbacks.
         """
+        prompt = self.prompt_service.generate_additional_places_prompt(user_request, count, avoid, exclude)
+        routes = [route] if route is not None else self.router.fallback_order(served_by)
+        last_error = None
+        for candidate in routes:
+            try:
+                places, _ = await self._complete(prompt, max_retries, candidate)
+                break
+            except OpenAIError as e:
+                last_error = e
+                print(f"Model {candidate.key} failed, trying next route: {e.detail}")
+        else:
+            raise last_error
+        
+        seen = {name.casefold() for name in avoid}
+        additional = []
+        for place in places:
+            if place.name.casefold() not in seen:
+                seen.add(place.name.casefold())
+                additional.append(place)
+        return additional[:count]
+
+    async def _complete(self, prompt: str, max_retries: int, route: ModelRoute) -> Tuple[List[Place], List[str]]:
+        """Call the model and validate its output, retrying on transient errors"""
+        # Imported on first call so that importing the service stays cheap
+        from openai import RateLimitError, APITimeoutError, APIError
+        
         for attempt in range(max_retries + 1):
             try:
-                # Generate prompt using PromptService
-                prompt = self.prompt_service.generate_recommendation_prompt(
-                    user_request, num_places
-                )
-                
-                response = await self.client.chat.completions.create(
-                    model=self.model,
+                await self._throttle()
+                response = await self._create_completion(
+                    route,
                     messages=[
                         {"role": "system", "content": self.prompt_service.get_system_prompt()},
                         {"role": "user", "content": prompt}
                     ],
-                    response_format={"type": "json_object"},
+                    response_format=self._response_format(),
                     temperature=0.7,
                     max_tokens=2000
                 )
                 
-                # Parse the response
-                content = response.choices[0].message.content
-                response_data = json.loads(content)
-
-                # Extract places and exclusions
-                places_data = response_data.get("places", [])
-                exclusions = response_data.get("exclusions", [])
-
-                # Ensure places_data is a list
-                if not isinstance(places_data, list):
-                    raise ValueError(f"Expected places array, got {type(places_data)}")
-
-                # Convert to Place objects
-                places = []
-                for place_data in places_data:
-                    if not isinstance(place_data, dict):
-                        continue
-                    coords = Coordinates(
-                        lat=place_data.get("coords", {}).get("lat", 0.0),
-                        lng=place_data.get("coords", {}).get("lng", 0.0)
-                    )
-                    place = Place(
-                        name=place_data.get("name", "Unknown"),
-                        description=place_data.get("description", ""),
-                        coords=coords
-                    )
-                    places.append(place)
+                self._record_usage(prompt, response)
                 
-                # Validate that we got the expected number of places
-                if len(places) != num_places:
-                    print(f"Warning: Expected {num_places} places, but got {len(places)}")
-                    # If we got fewer places than expected, try to generate more
-                    if len(places) < num_places:
-                        print(f"Attempting to generate {num_places - len(places)} more places...")
-                        return await self.generate_recommendations(user_request, num_places)
+                # Validate in one pass, salvaging valid places from broken JSON
+                places, exclusions, repaired = parse_recommendations(response.choices[0].message.content)
+                if repaired:
+                    self.stats["repaired"] += 1
                 
                 return places, exclusions
                 
             except (RateLimitError, APITimeoutError) as e:
                 if attempt < max_retries:
                     wait_time = (2 ** attempt) * 1  # Exponential backoff: 1s, 2s, 4s
+                    self._check_retry_budget(wait_time, e)
                     print(f"OpenAI error (attempt {attempt + 1}/{max_retries + 1}): {str(e)}. Retrying in {wait_time}s...")
                     await asyncio.sleep(wait_time)
                     continue
@@ -92,13 +391,20 @@ class OpenAIService:
             except APIError as e:
                 if attempt < max_retries:
                     wait_time = (2 ** attempt) * 1
+                    self._check_retry_budget(wait_time, e)
                     print(f"OpenAI API error (attempt {attempt + 1}/{max_retries + 1}): {str(e)}. Retrying in {wait_time}s...")
                     await asyncio.sleep(wait_time)
                     continue
                 else:
                     raise OpenAIError(f"OpenAI API error after {max_retries + 1} attempts: {str(e)}")
+            except DeadlineExceededError:
+                raise
             except Exception as e:
                 raise OpenAIError(f"Error generating recommendations: {str(e)}")
 
-# Create global instance
-openai_service = OpenAIService() 
\ No newline at end of file
+    @staticmethod
+    def _check_retry_budget(wait_time: float, error: Exception):
+        """Give up instead of retrying when the backoff would outlive the deadline"""
+        left = remaining()
+        if left is not None and left <= wait_time:
+            raise DeadlineExceededError(f"no time left to retry OpenAI call ({str(error)})")
@@ -0,0 +1,45 @@
+# Canonical place -> names and spellings users and models commonly use for it.
+# Keys are stable identifiers; matching is done on normalized forms of the aliases.
+PLACE_ALIASES = {
+    # Rome
+    "colosseum": [
+        "Colosseum", "Coliseum", "Colosseo", "Coliseo", "Colisée", "Kolosseum",
+        "Колізей", "Колізеї", "Колізею", "Колизей", "Колизее", "Колізеум"
+    ],
+    "roman-forum": ["Roman Forum", "Foro Romano", "Forum Romanum", "Римський форум", "Римский форум"],
+    "vatican": [
+        "Vatican", "Vatican City", "Vaticano", "Città del Vaticano", "Vatikan", "Le Vatican",
+        "Ватикан", "Ватикані", "Ватикану",
+        "Vatican Museums", "Musei Vaticani", "Ватиканські музеї", "Ватиканские музеи",
+        "Sistine Chapel", "Cappella Sistina", "Сікстинська капела", "Сикстинская капелла",
+        "St. Peter's Basilica", "Saint Peter's Basilica", "Basilica di San Pietro",
+        "Собор Святого Петра", "Собор святого Петра"
+    ],
+    "trevi-fountain": ["Trevi Fountain", "Fontana di Trevi", "Фонтан Треві", "Фонтан Треви"],
+    "pantheon": ["Pantheon", "Panteón", "Panthéon", "Пантеон"],
+    "spanish-steps": ["Spanish Steps", "Scalinata di Trinità dei Monti", "Іспанські сходи", "Испанская лестница"],
+    "piazza-navona": ["Piazza Navona", "Пьяцца Навона", "П'яцца Навона"],
+    "trastevere": ["Trastevere", "Трастевере"],
+    "castel-sant-angelo": ["Castel Sant'Angelo", "Castel Sant Angelo", "Замок Святого Ангела"],
+    "borghese": ["Villa Borghese", "Galleria Borghese", "Borghese Gallery", "Вілла Боргезе", "Вилла Боргезе"],
+    # Paris
+    "eiffel-tower": ["Eiffel Tower", "Tour Eiffel", "La Tour Eiffel", "Torre Eiffel", "Eiffelturm", "Ейфелева вежа", "Эйфелева башня"],
+    "louvre": ["Louvre", "Louvre Museum", "Musée du Louvre", "Museo del Louvre", "Лувр"],
+    "notre-dame": ["Notre-Dame", "Notre Dame", "Notre-Dame de Paris", "Нотр-Дам", "Собор Паризької Богоматері", "Собор Парижской Богоматери"],
+    "montmartre": ["Montmartre", "Sacré-Cœur", "Sacre Coeur", "Монмартр"],
+    "arc-de-triomphe": ["Arc de Triomphe", "Arco del Triunfo", "Тріумфальна арка", "Триумфальная арка"],
+    "versailles": ["Versailles", "Palace of Versailles", "Château de Versailles", "Версаль"],
+    # Barcelona
+    "sagrada-familia": ["Sagrada Familia", "Sagrada Família", "Саграда Фамілія", "Саграда Фамилия"],
+    "park-guell": ["Park Güell", "Park Guell", "Parc Güell", "Парк Гуель", "Парк Гуэль"],
+    "la-rambla": ["La Rambla", "Las Ramblas", "Рамбла", "Ла Рамбла"],
+    # London
+    "big-ben": ["Big Ben", "Elizabeth Tower", "Біг-Бен", "Биг-Бен"],
+    "british-museum": ["British Museum", "Британський музей", "Британский музей"],
+    "tower-of-london": ["Tower of London", "Тауер", "Лондонський Тауер", "Лондонский Тауэр"],
+    # Other frequent destinations
+    "acropolis": ["Acropolis", "Parthenon", "Акрополь", "Парфенон"],
+    "times-square": ["Times Square", "Таймс-сквер"],
+    "central-park": ["Central Park", "Центральний парк", "Центральный парк"],
+    "statue-of-liberty": ["Statue of Liberty", "Статуя Свободи", "Статуя Свободы"]
+}
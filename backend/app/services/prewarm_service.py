@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.shared_state import SharedState
+from app.services.database_service import DatabaseService
+from app.services.exclusion_service import ExclusionService
+from app.services.openai_service import OpenAIService, normalize_request_text
+
+logger = logging.getLogger(__name__)
+
+class PrewarmService:
+    """
+    Mines the most requested destinations and interests from travel_requests
+    and caches fresh recommendations for them off-peak, under a spend budget.
+    """
+
+    LEASE_KEY = "prewarm:run"
+
+    def __init__(self, session_factory, openai_service: OpenAIService, shared_state: SharedState):
+        self.session_factory = session_factory
+        self.openai_service = openai_service
+        self.shared_state = shared_state
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    async def find_popular_requests(self) -> List[Dict[str, Any]]:
+        """Most frequent request texts that start a trip (no exclusions), most popular first"""
+        since = datetime.now(timezone.utc) - timedelta(days=settings.prewarm_lookback_days)
+        async with self.session_factory() as session:
+            rows = await DatabaseService(session).get_requests_since(since)
+
+        counts = Counter()
+        spellings: Dict[tuple, Counter] = {}
+        for row in rows:
+            # Refinements only make sense within their conversation
+            if row["exclude"] or ExclusionService.extract(row["text"]):
+                continue
+            key = (normalize_request_text(row["text"]), row["num_places"])
+            if not key[0]:
+                continue
+            counts[key] += 1
+            spellings.setdefault(key, Counter())[row["text"].strip()] += 1
+
+        return [
+            {"text": spellings[key].most_common(1)[0][0], "num_places": key[1], "count": count}
+            for key, count in counts.most_common(settings.prewarm_max_items)
+            if count >= settings.prewarm_min_count
+        ]
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Pre-warm popular requests that are not cached yet until the budget is spent"""
+        summary = {"started_at": time.time(), "candidates": 0, "warmed": 0, "skipped": 0, "failed": 0, "spent_usd": 0.0}
+        candidates = await self.find_popular_requests()
+        summary["candidates"] = len(candidates)
+
+        for candidate in candidates:
+            text, num_places = candidate["text"], candidate["num_places"]
+            if await self.openai_service.is_prewarmed(text, num_places):
+                summary["skipped"] += 1
+                continue
+
+            cost = self.openai_service.estimate_cost(text, num_places, settings.prewarm_completion_tokens_per_place)
+            if summary["spent_usd"] + cost > settings.prewarm_budget_usd:
+                logger.info(f"Pre-warm budget of ${settings.prewarm_budget_usd} reached")
+                break
+
+            try:
+                await self.openai_service.prewarm(text, num_places, settings.prewarm_ttl)
+                summary["warmed"] += 1
+            except Exception as e:
+                summary["failed"] += 1
+                logger.warning(f"Pre-warming '{text}' failed: {str(e)}")
+            summary["spent_usd"] += cost
+
+        summary["spent_usd"] = round(summary["spent_usd"], 6)
+        summary["finished_at"] = time.time()
+        self.last_run = summary
+        return summary
+
+    @staticmethod
+    def is_off_peak(now: Optional[datetime] = None) -> bool:
+        return (now or datetime.now()).hour in settings.prewarm_hours
+
+    async def run_if_due(self) -> Optional[Dict[str, Any]]:
+        """Run once per off-peak window, in one worker process only"""
+        if not self.is_off_peak():
+            return None
+
+        done_key = f"prewarm:done:{datetime.now().date().isoformat()}"
+        if await self.shared_state.cache_get(done_key) is not None:
+            return None
+        if not await self.shared_state.try_lease(self.LEASE_KEY, ttl=3600):
+            return None
+
+        try:
+            summary = await self.run_once()
+            await self.shared_state.cache_set(done_key, summary, ttl=86400)
+            logger.info(f"Pre-warmed {summary['warmed']} of {summary['candidates']} popular request(s)")
+            return summary
+        finally:
+            await self.shared_state.release_lease(self.LEASE_KEY)
+
+    async def run_forever(self):
+        """Scheduler loop started by the application lifespan"""
+        while True:
+            try:
+                await self.run_if_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Pre-warm run failed: {str(e)}")
+            await asyncio.sleep(settings.prewarm_check_interval)
@@ -1,5 +1,58 @@
 from typing import List, Optional
 
+def _compact(text: str) -> str:
+    """Strip indentation and blank lines to avoid paying for whitespace tokens"""
+    return "\n".join(line.strip() for line in text.strip().splitlines() if line.strip())
+
+# Static content lives in the system message and never changes between
+# requests. At roughly 500 tokens it is below the 1,024-token minimum for
+# provider-side prompt caching, so cached_prompt_tokens stays 0 unless it grows
+_SYSTEM_PROMPT = _compact("""
+    You are a travel expert specializing in specific local recommendations.
+    Always respond with valid JSON objects only.
+    Always answer in the same language as the user's request.
+    Recommend SPECIFIC PLACES within cities, not cities themselves.
+    Focus on restaurants, attractions, neighborhoods, and local spots.
+    Understand and respect user preferences and exclusions mentioned in their request.
+    When processing refinements, maintain the original context and preferences.
+    Extract exclusions from user text and return them separately from recommendations.
+
+    CRITICAL: You must recommend SPECIFIC PLACES within the mentioned city/region, NOT cities themselves.
+    Examples of what to recommend:
+    - Restaurants, cafes, trattorias (for food lovers)
+    - Tourist attractions, monuments, museums
+    - Neighborhoods, districts, piazzas
+    - Parks, gardens, viewpoints
+    - Shopping areas, markets
+    - Cultural venues, theaters, galleries
+
+    If user mentions a city (like "Rome", "Paris", "Tokyo"), recommend specific places within that city.
+    If user mentions food preferences, focus on restaurants and food-related places.
+    If user mentions interests (history, art, nature), recommend relevant specific locations.
+
+    IMPORTANT: The request contains conversation history. Pay attention to:
+    1. The original user preferences (where they want to go, what they like)
+    2. Any places they want to exclude from previous messages
+
+    If the user is making a refinement (like "не хочу в..."), maintain the original context
+    and preferences while applying the new exclusions.
+
+    Analyze the user's request carefully. If they mention places they don't want to visit
+    (using phrases like "не хочу", "don't want", "no quiero", "je ne veux pas", "не показуй", etc.),
+    extract those places as exclusions.
+
+    Return a JSON object with TWO fields:
+    1. "places": array with EXACTLY the requested number of objects, each with:
+    - "name": specific place name (restaurant, attraction, neighborhood, etc.)
+    - "description": brief description of why this place is recommended
+    - "coords": {"lat": number, "lng": number} (realistic coordinates within the city)
+    2. "exclusions": array of places to exclude (can be empty if no exclusions mentioned)
+
+    Ensure coordinates are realistic for the specific place within the mentioned city.
+    Return ONLY the JSON object, no additional text.
+    Answer in the same language as the user's request.
+""")
+
 class PromptService:
     """Service for generating AI prompts"""
     
@@ -9,58 +62,29 @@ class PromptService:
         num_places: int = 3
     ) -> str:
         """
-        Generate prompt for travel recommendations with exclusion handling
+        Generate the per-request part of the prompt (the static instructions
+        are sent once in the system prompt)
+        """
+        return f"Generate EXACTLY {num_places} specific travel recommendations based on this request:\n{user_request.strip()}"
+    
+    @staticmethod
+    def generate_additional_places_prompt(
+        user_request: str,
+        num_places: int,
+        avoid: List[str],
+        exclude: Optional[List[str]] = None
+    ) -> str:
         """
-        prompt = f"""
-        Generate EXACTLY {num_places} specific travel recommendations based on this request: "{user_request}"
-        
-        CRITICAL: You must recommend SPECIFIC PLACES within the mentioned city/region, NOT cities themselves.
-        Examples of what to recommend:
-        - Restaurants, cafes, trattorias (for food lovers)
-        - Tourist attractions, monuments, museums
-        - Neighborhoods, districts, piazzas
-        - Parks, gardens, viewpoints
-        - Shopping areas, markets
-        - Cultural venues, theaters, galleries
-        
-        If user mentions a city (like "Rome", "Paris", "Tokyo"), recommend specific places within that city.
-        If user mentions food preferences, focus on restaurants and food-related places.
-        If user mentions interests (history, art, nature), recommend relevant specific locations.
-        
-        IMPORTANT: This request contains conversation history. Pay attention to:
-        1. The original user preferences (where they want to go, what they like)
-        2. Any places they want to exclude from previous messages
-        
-        If the user is making a refinement (like "не хочу в..."), maintain the original context 
-        and preferences while applying the new exclusions.
-        
-        Analyze the user's request carefully. If they mention places they don't want to visit 
-        (using phrases like "не хочу", "don't want", "no quiero", "je ne veux pas", "не показуй", etc.), 
-        extract those places as exclusions.
-        
-        Return a JSON object with TWO fields:
-        1. "places": array with EXACTLY {num_places} objects, each with:
-           - "name": specific place name (restaurant, attraction, neighborhood, etc.)
-           - "description": brief description of why this place is recommended
-           - "coords": {{"lat": number, "lng": number}} (realistic coordinates within the city)
-        2. "exclusions": array of places to exclude (can be empty if no exclusions mentioned)
-        
-        Ensure coordinates are realistic for the specific place within the mentioned city.
-        Return ONLY the JSON object, no additional text.
-        Answer in the same language as the user's request.
+        Generate prompt asking only for the places still missing from an answer
         """
-        return prompt.strip()
+        prompt = f"Generate EXACTLY {num_places} more specific travel recommendations based on this request:\n{user_request.strip()}"
+        if avoid:
+            prompt += f"\nDo not repeat these places: {', '.join(avoid)}"
+        if exclude:
+            prompt += f"\nThe user excluded these places, never recommend them or anything inside them: {', '.join(exclude)}"
+        return prompt
     
     @staticmethod
     def get_system_prompt() -> str:
         """Get system prompt for OpenAI"""
-        return (
-            "You are a travel expert specializing in specific local recommendations. "
-            "Always respond with valid JSON objects only. "
-            "Always answer in the same language as the user's request. "
-            "Recommend SPECIFIC PLACES within cities, not cities themselves. "
-            "Focus on restaurants, attractions, neighborhoods, and local spots. "
-            "Understand and respect user preferences and exclusions mentioned in their request. "
-            "When processing refinements, maintain the original context and preferences. "
-            "Extract exclusions from user text and return them separately from recommendations."
-        ) 
\ No newline at end of file
+        return _SYSTEM_PROMPT
@@ -1,34 +1,182 @@
-from typing import List, Optional, Dict, Any
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from fastapi.encoders import jsonable_encoder
 from app.schemas import TravelRequestCreate, Place
-from app.services.openai_service import openai_service
+from app.core.config import settings
+from app.services.openai_service import OpenAIService, normalize_request_text
 from app.services.database_service import DatabaseService
-from app.core.exceptions import OpenAIError, DatabaseError
+from app.services.token_counter import count_tokens
+from app.services.exclusion_service import ExclusionService, ExclusionSet, normalize_place_name
+from app.core.shared_state import SharedState
+from app.core.profiling import stage
+from app.core.admission import AdmissionController
+from app.core.exceptions import (
+    OpenAIError, DatabaseError, DeadlineExceededError, IdempotencyConflictError, OverloadedError
+)
+
+logger = logging.getLogger(__name__)
 
 class RecommendationService:
-    def __init__(self, database_service: DatabaseService):
+    def __init__(
+        self,
+        database_service: DatabaseService,
+        openai_service: OpenAIService,
+        shared_state: Optional[SharedState] = None
+    ):
         self.db_service = database_service
+        self.openai_service = openai_service
+        self.shared_state = shared_state
     
     async def create_recommendations(self, request_data: TravelRequestCreate) -> Dict[str, Any]:
         """Create new travel recommendations with context from previous requests"""
         try:
             # Get recent requests to build context
-            recent_requests = await self.db_service.get_recent_requests(limit=5)
+            with stage("db_read"):
+                recent_requests = await self.db_service.get_recent_requests(limit=5)
+            
+            with stage("context"):
+                # Extract exclusions locally so they are known before the model call
+                local_exclusions = ExclusionService.extract(request_data.text)
+                excluded = self._exclusion_set(recent_requests)
+                
+                # Build context from recent requests
+                context = self._build_context_from_history(recent_requests, request_data, local_exclusions, excluded)
             
-            # Build context from recent requests
-            context = self._build_context_from_history(recent_requests, request_data)
+            # Popular trip requests are pre-warmed off-peak; history exclusions are enforced below
+            places, new_exclusions, served_by = None, [], None
+            with stage("cache"):
+                if not local_exclusions:
+                    places = await self.openai_service.get_prewarmed(request_data.text, request_data.num_places)
             
             # Generate recommendations and extract exclusions from text
-            places, new_exclusions = await openai_service.generate_recommendations(
-                user_request=context,
-                num_places=request_data.num_places
-            )
+            if places is None:
+                with stage("openai"):
+                    places, new_exclusions, served_by = await self.openai_service.generate_recommendations(
+                        user_request=context,
+                        num_places=request_data.num_places,
+                        current_text=request_data.text,
+                        has_history=bool(recent_requests)
+                    )
             
             # Accumulate exclusions from previous requests
-            accumulated_exclusions = self._accumulate_exclusions(recent_requests, new_exclusions)
+            excluded.add(local_exclusions)
+            excluded.add(new_exclusions)
+            accumulated_exclusions = excluded.names()
+            
+            # Drop places that violate exclusions and fetch only the replacements
+            with stage("exclusions"):
+                places = await self._enforce_exclusions(
+                    places, excluded, context, request_data.num_places, served_by
+                )
             
             # Save to database with accumulated exclusions
+            with stage("db_write"):
+                db_request = await self.db_service.create_travel_request(
+                    request_data, 
+                    [place.dict() for place in places],
+                    accumulated_exclusions
+                )
+            
+            return {
+                "id": db_request.id,
+                "text": db_request.text,
+                "exclude": db_request.exclude,
+                "num_places": db_request.num_places,
+                "response_json": places,
+                "created_at": db_request.created_at
+            }
+            
+        except DeadlineExceededError:
+            raise
+        except Exception as e:
+            raise OpenAIError(f"Failed to create recommendations: {str(e)}")
+    
+    async def create_recommendations_admitted(
+        self,
+        request_data: TravelRequestCreate,
+        admission: AdmissionController
+    ) -> Dict[str, Any]:
+        """
+        Create recommendations in an admission slot. When the slot is refused,
+        answer degraded (result has a "degraded" key) if possible, else re-raise.
+        """
+        try:
+            async with admission.slot():
+                return await self.create_recommendations(request_data)
+        except OverloadedError:
+            if not settings.admission_degrade:
+                raise
+            # Degraded answers still hit the database, so only a few run at once
+            async with admission.degraded_slot() as acquired:
+                degraded = await self.create_degraded_recommendations(request_data) if acquired else None
+            if degraded is None:
+                raise
+            admission.stats["degraded"] += 1
+            return degraded
+    
+    async def create_recommendations_idempotent(
+        self,
+        request_data: TravelRequestCreate,
+        idempotency_key: str,
+        create: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Create recommendations at most once per idempotency key.
+        A retry gets the stored result, or waits for the in-progress one in any
+        worker process. Returns: (result, replayed)
+        """
+        create = create or (lambda: self.create_recommendations(request_data))
+        if self.shared_state is None:
+            return await create(), False
+        
+        fingerprint = hashlib.sha256(f"{request_data.num_places}\x00{request_data.text}".encode("utf-8")).hexdigest()
+        computed = False
+        
+        async def compute():
+            nonlocal computed
+            computed = True
+            result = await create()
+            return {"fingerprint": fingerprint, "result": jsonable_encoder(result)}
+        
+        key = "idempotency:" + hashlib.sha256(idempotency_key.encode("utf-8")).hexdigest()
+        stored = await self.shared_state.get_or_compute(
+            key,
+            compute,
+            ttl=settings.idempotency_ttl,
+            lease_ttl=settings.request_timeout * 2
+        )
+        if stored["fingerprint"] != fingerprint:
+            raise IdempotencyConflictError("Idempotency-Key was already used for a different request")
+        return stored["result"], not computed
+    
+    async def create_degraded_recommendations(self, request_data: TravelRequestCreate) -> Optional[Dict[str, Any]]:
+        """
+        Answer without calling the model while overloaded: a pre-warmed answer
+        or the answer to the most similar past request. Returns None when
+        there is nothing suitable, e.g. for refinements with exclusions.
+        """
+        try:
+            if ExclusionService.extract(request_data.text):
+                return None
+            
+            source = "cached"
+            places = await self.openai_service.get_prewarmed(request_data.text, request_data.num_places)
+            if places is None:
+                source = "similar"
+                places = await self._find_similar_answer(request_data)
+            if not places:
+                return None
+            
+            recent_requests = await self.db_service.get_recent_requests(limit=5)
+            excluded = self._exclusion_set(recent_requests)
+            accumulated_exclusions = excluded.names()
+            places = self._filter_excluded(places, excluded)[:request_data.num_places]
+            if not places:
+                return None
+            
             db_request = await self.db_service.create_travel_request(
-                request_data, 
+                request_data,
                 [place.dict() for place in places],
                 accumulated_exclusions
             )
@@ -39,24 +187,69 @@ class RecommendationService:
                 "exclude": db_request.exclude,
                 "num_places": db_request.num_places,
                 "response_json": places,
-                "created_at": db_request.created_at
+                "created_at": db_request.created_at,
+                "degraded": source
             }
             
         except Exception as e:
-            raise OpenAIError(f"Failed to create recommendations: {str(e)}")
+            logger.warning(f"Degraded answer failed: {str(e)}")
+            return None
+    
+    async def _find_similar_answer(self, request_data: TravelRequestCreate) -> Optional[List[Place]]:
+        """Places of the past request whose words overlap the most with this one"""
+        words = set(normalize_request_text(request_data.text).split())
+        if not words:
+            return None
+        
+        best, best_score = None, 0.0
+        for request in await self.db_service.get_recent_answers(request_data.num_places):
+            if not request.response_json or request.exclude:
+                continue
+            other = set(normalize_request_text(request.text).split())
+            score = len(words & other) / len(words | other) if other else 0.0
+            # Newest first, so ties keep the most recent answer
+            if score >= settings.admission_similarity and score > best_score:
+                best, best_score = request, score
+        
+        if best is None:
+            return None
+        return [Place(**place_data) for place_data in best.response_json]
     
-    def _build_context_from_history(self, recent_requests: List[Dict], current_request: TravelRequestCreate) -> str:
-        """Build context from recent requests"""
+    def _build_context_from_history(
+        self,
+        recent_requests: List[Dict],
+        current_request: TravelRequestCreate,
+        current_exclusions: Optional[List[str]] = None,
+        excluded: Optional[ExclusionSet] = None
+    ) -> str:
+        """Build context from recent requests within the history token budget"""
         context_parts = []
+        budget = settings.prompt_history_token_budget
+        if excluded is None:
+            excluded = self._exclusion_set(recent_requests)
+        
+        # Stored exclusions are cumulative, so they are listed once rather than per message
+        excluded_line = f"Previously excluded: {', '.join(excluded.names())}" if excluded else None
+        if excluded_line:
+            budget -= count_tokens(excluded_line, settings.openai_model)
         
-        # Add recent user requests for context
+        # Add recent user requests for context, newest first, until the budget is spent
         for i, request in enumerate(recent_requests, 1):
-            context_parts.append(f"Message {i}: {request['text']}")
-            if request['exclude']:
-                context_parts.append(f"Excluded in message {i}: {', '.join(request['exclude'])}")
+            message = f"Message {i}: {request['text']}"
+            tokens = count_tokens(message, settings.openai_model)
+            if tokens > budget:
+                break
+            budget -= tokens
+            context_parts.append(message)
         
-        # Add current request
+        if excluded_line:
+            context_parts.append(excluded_line)
+        
+        # Add current request with the exclusions it adds
         context_parts.append(f"Current message: {current_request.text}")
+        new_exclusions = [exclusion for exclusion in current_exclusions or [] if exclusion not in excluded]
+        if new_exclusions:
+            context_parts.append(f"Excluded in current message: {', '.join(new_exclusions)}")
         
         # Add summary instruction
         if len(recent_requests) > 0:
@@ -64,27 +257,80 @@ class RecommendationService:
         
         return "\n".join(context_parts)
     
-    def _accumulate_exclusions(self, recent_requests: List[Dict], new_exclusions: List[str]) -> List[str]:
-        """Accumulate exclusions from previous requests and new ones"""
-        accumulated_exclusions = []
-        
-        # Add exclusions from recent requests
+    @staticmethod
+    def _exclusion_set(recent_requests: List[Dict]) -> ExclusionSet:
+        """Exclusions of the conversation so far, newest request first"""
+        excluded = ExclusionSet()
+        # Each row stores the exclusions accumulated up to it, so the newest
+        # one normally carries the whole set and older rows add nothing
         for request in recent_requests:
             if request['exclude']:
-                accumulated_exclusions.extend(request['exclude'])
-        
-        # Add new exclusions from current request
-        accumulated_exclusions.extend(new_exclusions)
+                excluded.add(request['exclude'])
+        return excluded
+    
+    async def _enforce_exclusions(
+        self,
+        places: List[Place],
+        exclusions: ExclusionSet,
+        context: str,
+        num_places: int,
+        served_by: Optional[str] = None
+    ) -> List[Place]:
+        """
+        Remove places matching any exclusion and request replacements for them
+        from the model that served the answer. If replacements cannot be had,
+        the places already kept are returned.
+        """
+        if not exclusions:
+            return places
         
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_exclusions = []
-        for exclusion in accumulated_exclusions:
-            if exclusion not in seen:
-                seen.add(exclusion)
-                unique_exclusions.append(exclusion)
+        kept = self._filter_excluded(places, exclusions)
+        rounds = 0
+        while len(kept) < num_places and rounds < settings.exclusion_replacement_rounds:
+            rounds += 1
+            missing = num_places - len(kept)
+            logger.info(f"Replacing {missing} place(s) that violated exclusions (round {rounds})")
+            try:
+                replacements = await self.openai_service.generate_additional_places(
+                    context,
+                    missing,
+                    avoid=[place.name for place in places],
+                    exclude=exclusions.names(),
+                    served_by=served_by
+                )
+            except OpenAIError as e:
+                if not kept:
+                    raise
+                logger.warning(f"Replacing excluded places failed, returning {len(kept)} place(s): {e.detail}")
+                break
+            places = places + replacements
+            kept.extend(self._filter_excluded(replacements, exclusions, kept))
         
-        return unique_exclusions
+        if not kept:
+            raise OpenAIError("every recommended place matched an exclusion")
+        return kept[:num_places]
+    
+    @staticmethod
+    def _filter_excluded(
+        places: List[Place],
+        exclusions: ExclusionSet,
+        already_kept: Optional[List[Place]] = None
+    ) -> List[Place]:
+        """Places that match no exclusion and are not duplicates of kept ones"""
+        # Alias groups are coarse (St. Peter's and the Sistine Chapel are both "vatican"),
+        # so duplicates are only exact names after normalization
+        seen = {normalize_place_name(place.name) for place in already_kept or []}
+        kept = []
+        for place in places:
+            violated = exclusions.match(place.name)
+            if violated:
+                logger.warning(f"Dropping '{place.name}': matches exclusion '{violated}'")
+                continue
+            key = normalize_place_name(place.name)
+            if key not in seen:
+                seen.add(key)
+                kept.append(place)
+        return kept
     
     async def get_recommendations(self, request_id: int) -> Optional[Dict[str, Any]]:
         """Get recommendations by ID"""
@@ -0,0 +1,109 @@
+import logging
+import re
+from typing import Any, List, Tuple
+
+import pydantic_core
+from pydantic import TypeAdapter, ValidationError
+
+from app.schemas import Place, RecommendationOutput
+
+logger = logging.getLogger(__name__)
+
+# Built once: validators are compiled on construction
+_output_adapter = TypeAdapter(RecommendationOutput)
+_places_adapter = TypeAdapter(List[Place])
+_place_adapter = TypeAdapter(Place)
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+# Strict JSON schema for structured outputs (response_format type "json_schema")
+RESPONSE_SCHEMA = {
+    "name": "travel_recommendations",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "places": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "description": {"type": "string"},
+                        "coords": {
+                            "type": "object",
+                            "properties": {
+                                "lat": {"type": "number"},
+                                "lng": {"type": "number"}
+                            },
+                            "required": ["lat", "lng"],
+                            "additionalProperties": False
+                        }
+                    },
+                    "required": ["name", "description", "coords"],
+                    "additionalProperties": False
+                }
+            },
+            "exclusions": {
+                "type": "array",
+                "items": {"type": "string"}
+            }
+        },
+        "required": ["places", "exclusions"],
+        "additionalProperties": False
+    }
+}
+
+def parse_recommendations(content: str) -> Tuple[List[Place], List[str], bool]:
+    """
+    Validate model output in a single pass, salvaging what is valid from
+    slightly broken JSON (code fences, truncation, invalid items).
+    Returns: (places, exclusions, repaired)
+    """
+    try:
+        output = _output_adapter.validate_json(content)
+        return output.places, output.exclusions, False
+    except ValidationError:
+        pass
+    
+    places, exclusions = _salvage(content)
+    logger.warning(f"Repaired malformed model output, salvaged {len(places)} place(s)")
+    return places, exclusions, True
+
+def _salvage(content: str) -> Tuple[List[Place], List[str]]:
+    """Best-effort extraction of valid places and exclusions"""
+    text = _CODE_FENCE.sub("", (content or "").strip())
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        return [], []
+    
+    try:
+        data: Any = pydantic_core.from_json(text[start:], allow_partial=True)
+    except ValueError:
+        return [], []
+    
+    if isinstance(data, list):
+        places_data, exclusions_data = data, []
+    elif isinstance(data, dict):
+        places_data = data.get("places", [])
+        exclusions_data = data.get("exclusions", [])
+    else:
+        return [], []
+    
+    if not isinstance(places_data, list):
+        places_data = []
+    if not isinstance(exclusions_data, list):
+        exclusions_data = []
+    
+    try:
+        places = _places_adapter.validate_python(places_data)
+    except ValidationError:
+        places = []
+        for item in places_data:
+            try:
+                places.append(_place_adapter.validate_python(item))
+            except ValidationError:
+                continue
+    
+    exclusions = [item for item in exclusions_data if isinstance(item, str) and item.strip()]
+    return places, exclusions
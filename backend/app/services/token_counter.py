@@ -0,0 +1,92 @@
+"""
+Local token counting with tiktoken.
+
+tiktoken downloads a model's BPE file the first time it is used. To run
+offline, pre-seed the files at build time:
+
+    TIKTOKEN_CACHE_DIR=./.tiktoken_cache python -m app.services.token_counter
+
+and set TIKTOKEN_CACHE_DIR to the same directory when serving. Until an
+encoding is available, counts use a rough approximation.
+"""
+import asyncio
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rough BPE approximation: words, numbers and single punctuation marks
+_TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]", re.UNICODE)
+
+# Seconds before loading a tokenizer is tried again after a failure
+_RETRY_INTERVAL = 600.0
+
+_encoders: Dict[str, Callable[[str], List[int]]] = {}
+_retry_at: Dict[str, float] = {}
+_loading = set()
+_lock = threading.Lock()
+
+def _approximate_tokens(text: str) -> int:
+    return len(_TOKEN_PATTERN.findall(text))
+
+def load_encoder(model: str) -> bool:
+    """Load the tokenizer for model (blocking, may download); False if unavailable"""
+    if settings.tiktoken_cache_dir:
+        os.environ.setdefault("TIKTOKEN_CACHE_DIR", settings.tiktoken_cache_dir)
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        with _lock:
+            _encoders[model] = encoding.encode
+        return True
+    except Exception as e:
+        # tiktoken missing or its BPE files unavailable (offline without TIKTOKEN_CACHE_DIR)
+        logger.warning(f"tiktoken unavailable for {model}, using approximate token counts: {str(e)}")
+        with _lock:
+            _retry_at[model] = time.monotonic() + _RETRY_INTERVAL
+        return False
+    finally:
+        with _lock:
+            _loading.discard(model)
+
+def _encoder_for(model: str) -> Optional[Callable[[str], List[int]]]:
+    """
+    The tokenizer for model, or None while it is unavailable. On the event
+    loop it is loaded in a worker thread so a download never blocks requests.
+    """
+    with _lock:
+        encode = _encoders.get(model)
+        if encode is not None or model in _loading or time.monotonic() < _retry_at.get(model, 0.0):
+            return encode
+        _loading.add(model)
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        load_encoder(model)
+        return _encoders.get(model)
+    loop.run_in_executor(None, load_encoder, model)
+    return None
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """Count tokens of text for model using a local tokenizer"""
+    encode = _encoder_for(model)
+    if encode is None:
+        return _approximate_tokens(text)
+    return len(encode(text))
+
+if __name__ == "__main__":
+    # Pre-seed TIKTOKEN_CACHE_DIR for the configured (or given) models
+    models = sys.argv[1:] or [settings.openai_model, settings.openai_fast_model, *settings.openai_fallback_models]
+    failed = [model for model in dict.fromkeys(filter(None, models)) if not load_encoder(model)]
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,106 @@
+"""
+Compare a pytest-benchmark JSON report against the stored baseline.
+
+Usage (from the backend directory):
+    python -m pytest benchmarks/ --benchmark-json=benchmark.json
+    python -m benchmarks.check_regression benchmark.json --threshold 0.2
+    python -m benchmarks.check_regression benchmark.json --update   # accept as new baseline
+
+Exits with status 1 when any benchmark's median got slower than the
+baseline by more than the threshold.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "baseline.json")
+
+def _machine(report: dict) -> Dict[str, str]:
+    info = report.get("machine_info", {})
+    return {
+        "python": info.get("python_version", ""),
+        "cpu": (info.get("cpu") or {}).get("brand_raw", ""),
+        "system": f"{info.get('system', '')} {info.get('release', '')}".strip()
+    }
+
+def load_report(path: str) -> Dict[str, Dict[str, float]]:
+    """Benchmark fullname -> summary stats from a pytest-benchmark JSON report"""
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    return {
+        bench["fullname"]: {
+            "median": bench["stats"]["median"],
+            "mean": bench["stats"]["mean"],
+            "stddev": bench["stats"]["stddev"],
+            "rounds": bench["stats"]["rounds"]
+        }
+        for bench in report["benchmarks"]
+    }
+
+def update_baseline(report_path: str, baseline_path: str):
+    with open(report_path, encoding="utf-8") as f:
+        report = json.load(f)
+    baseline = {"machine": _machine(report), "benchmarks": load_report(report_path)}
+    os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+    with open(baseline_path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Baseline with {len(baseline['benchmarks'])} benchmark(s) written to {baseline_path}")
+
+def compare(report_path: str, baseline_path: str, threshold: float) -> int:
+    """Print a comparison table and return the number of regressions"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(report_path, encoding="utf-8") as f:
+        machine = _machine(json.load(f))
+    current = load_report(report_path)
+
+    if machine != baseline.get("machine"):
+        print(f"Warning: baseline was recorded on {baseline.get('machine')}, this run is {machine}")
+
+    regressions = 0
+    print(f"{'benchmark':<72} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, stats in sorted(current.items()):
+        reference = baseline["benchmarks"].get(name)
+        if reference is None:
+            print(f"{name:<72} {'-':>10} {stats['median'] * 1000:9.2f}ms {'new':>8}")
+            continue
+
+        change = stats["median"] / reference["median"] - 1
+        status = ""
+        if change > threshold:
+            regressions += 1
+            status = "  REGRESSION"
+        print(
+            f"{name:<72} {reference['median'] * 1000:9.2f}ms {stats['median'] * 1000:9.2f}ms "
+            f"{change:+8.1%}{status}"
+        )
+
+    missing = sorted(set(baseline["benchmarks"]) - set(current))
+    for name in missing:
+        print(f"{name:<72} not run")
+
+    print(f"\n{regressions} regression(s) above {threshold:.0%}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Check benchmark results against the stored baseline")
+    parser.add_argument("report", help="JSON written by pytest --benchmark-json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown of the median, 0.2 = 20%%")
+    parser.add_argument("--update", action="store_true", help="Store the report as the new baseline")
+    args = parser.parse_args()
+
+    if args.update:
+        update_baseline(args.report, args.baseline)
+        return
+
+    if not os.path.exists(args.baseline):
+        raise SystemExit(f"No baseline at {args.baseline}, create one with --update")
+
+    sys.exit(1 if compare(args.report, args.baseline, args.threshold) else 0)
+
+if __name__ == "__main__":
+    main()
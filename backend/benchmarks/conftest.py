@@ -0,0 +1,43 @@
+"""
+Fixtures for the pytest-benchmark suite.
+
+Run from the backend directory:
+    python -m pytest benchmarks/ --benchmark-json=benchmark.json
+    python -m benchmarks.check_regression benchmark.json
+
+BENCH_DB_ROWS selects the seeded table sizes (default "10000,100000,1000000").
+"""
+import asyncio
+import os
+
+import pytest
+
+# Settings are read at import time, provide safe defaults for benchmarks
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-key")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./benchmark_travel_recommender.db")
+os.environ.setdefault("HOST", "127.0.0.1")
+os.environ.setdefault("PORT", "8000")
+
+from benchmarks.seed_data import seed_sqlite
+
+@pytest.fixture(scope="session")
+def run():
+    """Run a coroutine to completion on one loop shared by the whole session"""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+@pytest.fixture(scope="session")
+def seeded_databases(tmp_path_factory):
+    """Row count -> path of a SQLite file seeded with that many travel requests"""
+    directory = tmp_path_factory.mktemp("seeded")
+    paths = {}
+
+    def get(rows: int) -> str:
+        if rows not in paths:
+            path = str(directory / f"travel_{rows}.db")
+            seed_sqlite(path, rows)
+            paths[rows] = path
+        return paths[rows]
+
+    return get
@@ -0,0 +1,56 @@
+"""
+Minimal stand-in for the OpenAI chat completions API used by benchmarks.
+
+Run with:
+    FAKE_OPENAI_LATENCY=0.2 uvicorn benchmarks.fake_openai:app --port 9100
+and point the backend at it with OPENAI_BASE_URL=http://127.0.0.1:9100/v1
+"""
+import asyncio
+import json
+import os
+import re
+import time
+
+from fastapi import FastAPI, Request
+
+app = FastAPI()
+
+LATENCY = float(os.environ.get("FAKE_OPENAI_LATENCY", "0.2"))
+
+def fake_completion(prompt: str, model: str) -> dict:
+    match = re.search(r"EXACTLY (\d+)", prompt)
+    num_places = int(match.group(1)) if match else 3
+    places = [
+        {
+            "name": f"Place {i}",
+            "description": f"Benchmark place number {i}",
+            "coords": {"lat": 41.89 + i / 1000, "lng": 12.49 + i / 1000}
+        }
+        for i in range(1, num_places + 1)
+    ]
+    content = json.dumps({"places": places, "exclusions": []})
+    return {
+        "id": "chatcmpl-benchmark",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }
+        ],
+        "usage": {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (len(prompt) + len(content)) // 4
+        }
+    }
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    prompt = body["messages"][-1]["content"]
+    await asyncio.sleep(LATENCY)
+    return fake_completion(prompt, body.get("model", "fake"))
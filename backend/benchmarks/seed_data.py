@@ -0,0 +1,77 @@
+"""Synthetic travel requests for benchmarks"""
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Seeded table sizes for database benchmarks
+DB_ROWS = [int(rows) for rows in os.environ.get("BENCH_DB_ROWS", "10000,100000,1000000").split(",") if rows]
+
+DESTINATIONS = [
+    "Рим", "Париж", "Барселону", "Лондон", "Афіни", "Нью-Йорк", "Лісабон", "Прагу", "Відень", "Берлін",
+    "Rome", "Paris", "Barcelona", "London", "Athens", "New York", "Lisbon", "Prague", "Vienna", "Berlin"
+]
+INTERESTS = ["історію", "макарони", "музеї", "вино", "парки", "architecture", "street food", "nightlife"]
+EXCLUSIONS = [[], [], [], ["Колізей"], ["Ватикан", "Колізей"], ["Louvre"]]
+
+def request_text(i: int) -> str:
+    return f"Хочу в {DESTINATIONS[i % len(DESTINATIONS)]}, люблю {INTERESTS[i % len(INTERESTS)]}"
+
+def make_response_json(i: int, num_places: int = 3) -> list:
+    return [
+        {
+            "name": f"Place {i}-{n}",
+            "description": f"Benchmark place {n} for request {i}",
+            "coords": {"lat": 41.89 + n / 1000, "lng": 12.49 + n / 1000}
+        }
+        for n in range(1, num_places + 1)
+    ]
+
+def make_rows(count: int, num_places: int = 3) -> list:
+    """Rows as DatabaseService returns them, for service-level benchmarks"""
+    now = datetime(2024, 1, 1)
+    return [
+        SimpleNamespace(
+            id=i,
+            text=request_text(i),
+            exclude=EXCLUSIONS[i % len(EXCLUSIONS)],
+            num_places=num_places,
+            response_json=make_response_json(i, num_places),
+            created_at=now - timedelta(minutes=i)
+        )
+        for i in range(1, count + 1)
+    ]
+
+def seed_sqlite(path: str, rows: int):
+    """Bulk-insert rows directly with sqlite3, much faster than the ORM"""
+    from sqlalchemy import create_engine
+
+    import app.models  # noqa: F401  (register tables on Base.metadata)
+    from app.core.database import Base
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    start = datetime(2024, 1, 1)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    batch = []
+    for i in range(1, rows + 1):
+        batch.append((
+            request_text(i),
+            json.dumps(EXCLUSIONS[i % len(EXCLUSIONS)], ensure_ascii=False),
+            3,
+            json.dumps(make_response_json(i), ensure_ascii=False),
+            (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S")
+        ))
+        if len(batch) == 50_000 or i == rows:
+            conn.executemany(
+                "INSERT INTO travel_requests (text, exclude, num_places, response_json, created_at) VALUES (?, ?, ?, ?, ?)",
+                batch
+            )
+            conn.commit()
+            batch = []
+    conn.close()
@@ -0,0 +1,106 @@
+"""
+Cold start benchmark for a worker process.
+
+Measures, in fresh interpreters:
+- import time per module for ``import app.main`` (``python -X importtime``)
+- time until the application lifespan startup has completed
+
+Usage (from the backend directory):
+    python -m benchmarks.startup --runs 5 --top 20
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run startup against a throwaway database and without network warm-up
+STARTUP_SNIPPET = """
+import asyncio, time
+t0 = time.perf_counter()
+from app.main import app, lifespan
+t1 = time.perf_counter()
+async def main():
+    async with lifespan(app):
+        t2 = time.perf_counter()
+    print(f"{t1 - t0:.6f} {t2 - t0:.6f}")
+asyncio.run(main())
+"""
+
+def _env(db_path: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "benchmark-key")
+    env.setdefault("HOST", "127.0.0.1")
+    env.setdefault("PORT", "8000")
+    env["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    return env
+
+def measure_import_times(env: Dict[str, str]) -> List[Tuple[str, int, int, int]]:
+    """Return (module, self_us, cumulative_us, depth) for one fresh import of app.main"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_part, cumulative_part, raw_name = line.split("|")
+        self_us = int(self_part.split(":")[1])
+        cumulative_us = int(cumulative_part)
+        depth = (len(raw_name) - len(raw_name.lstrip())) // 2
+        rows.append((raw_name.strip(), self_us, cumulative_us, depth))
+    return rows
+
+def measure_startup(env: Dict[str, str]) -> Tuple[float, float]:
+    """Return (import seconds, import + lifespan startup seconds)"""
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SNIPPET],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    import_s, ready_s = result.stdout.strip().splitlines()[-1].split()
+    return float(import_s), float(ready_s)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure worker cold start time")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters")
+    parser.add_argument("--top", type=int, default=20, help="Top-level modules to report")
+    args = parser.parse_args()
+
+    cumulative = defaultdict(list)
+    self_times = defaultdict(list)
+    import_runs = []
+    ready_runs = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env(os.path.join(tmp, "startup.db"))
+        env.setdefault("WARM_CONNECTIONS_ON_STARTUP", "false")
+        for _ in range(args.runs):
+            for name, self_us, cumulative_us, depth in measure_import_times(env):
+                self_times[name].append(self_us)
+                # Depth 1 are packages imported directly while importing app.main
+                if depth <= 1 or name.startswith("app"):
+                    cumulative[name].append(cumulative_us)
+            import_s, ready_s = measure_startup(env)
+            import_runs.append(import_s)
+            ready_runs.append(ready_s)
+
+    print(f"Runs: {args.runs}")
+    print(f"import app.main:      median {statistics.median(import_runs) * 1000:8.1f} ms")
+    print(f"lifespan ready:       median {statistics.median(ready_runs) * 1000:8.1f} ms")
+    print()
+    print(f"{'module':50} {'cumulative ms':>14} {'self ms':>10}")
+    ranked = sorted(cumulative.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, values in ranked[:args.top]:
+        print(
+            f"{name:50} {statistics.median(values) / 1000:14.1f} "
+            f"{statistics.median(self_times[name]) / 1000:10.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""End-to-end throughput of POST /api/v1/recommendations/ in-process, with a fake LLM"""
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.resources import resources
+from app.main import app
+from benchmarks.fake_openai import fake_completion
+
+UPSTREAM_LATENCY = 0.02
+REQUESTS_PER_ROUND = 200
+CONCURRENCY = 20
+
+class InProcessOpenAI:
+    """AsyncOpenAI stand-in answering like benchmarks.fake_openai, without sockets"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, model, messages, **kwargs):
+        from openai.types.chat import ChatCompletion
+
+        await asyncio.sleep(self.latency)
+        return ChatCompletion.model_validate(fake_completion(messages[-1]["content"], model))
+
+@pytest.fixture(scope="module")
+def client(run, tmp_path_factory):
+    directory = tmp_path_factory.mktemp("asgi")
+    overrides = {
+        "database_url": f"sqlite+aiosqlite:///{directory}/travel.db",
+        "shared_state_path": str(directory / "shared.db"),
+        "job_queue_path": str(directory / "jobs.db"),
+        "warm_connections_on_startup": False,
+        "jobs_enabled": False,
+        "loop_monitor_enabled": False,
+        "admission_max_in_flight": 0,
+        "recommendation_cache_ttl": 0
+    }
+    previous = {name: getattr(settings, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    from app.services import OpenAIService
+
+    run(resources.startup())
+    resources._openai_service = OpenAIService(client=InProcessOpenAI(UPSTREAM_LATENCY), shared_state=resources.shared_state)
+    transport = httpx.ASGITransport(app=app)
+    client = httpx.AsyncClient(transport=transport, base_url="http://benchmark")
+    yield client
+
+    run(client.aclose())
+    run(resources.shutdown())
+    for name, value in previous.items():
+        setattr(settings, name, value)
+
+def test_create_recommendations_throughput(benchmark, run, client):
+    counter = itertools.count()
+
+    async def round_of_requests():
+        queue = asyncio.Queue()
+        for _ in range(REQUESTS_PER_ROUND):
+            queue.put_nowait(next(counter))
+        statuses = []
+
+        async def worker():
+            while not queue.empty():
+                i = queue.get_nowait()
+                response = await client.post(
+                    "/api/v1/recommendations/",
+                    json={"text": f"Trip {i} to Rome, love history", "num_places": 3}
+                )
+                statuses.append(response.status_code)
+
+        await asyncio.gather(*[worker() for _ in range(CONCURRENCY)])
+        return statuses
+
+    statuses = benchmark.pedantic(lambda: run(round_of_requests()), rounds=3, warmup_rounds=1)
+    benchmark.extra_info["requests_per_round"] = REQUESTS_PER_ROUND
+    if benchmark.stats is not None:  # None under --benchmark-disable
+        benchmark.extra_info["requests_per_second"] = round(REQUESTS_PER_ROUND / benchmark.stats.stats.median, 1)
+
+    assert statuses.count(200) == REQUESTS_PER_ROUND
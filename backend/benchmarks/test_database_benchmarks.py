@@ -0,0 +1,35 @@
+"""DatabaseService queries against seeded SQLite tables of growing size"""
+import pytest
+
+from app.core.database import create_engine_for_url, create_session_factory
+from app.services import DatabaseService
+from benchmarks.seed_data import DB_ROWS
+
+QUERIES = {
+    "recent_requests": lambda service, rows: service.get_recent_requests(limit=5),
+    "history_first_page": lambda service, rows: service.get_all_travel_requests(limit=10, offset=0),
+    "history_deep_page": lambda service, rows: service.get_all_travel_requests(limit=10, offset=rows // 2),
+    "by_id": lambda service, rows: service.get_travel_request_by_id(rows // 2),
+    "search": lambda service, rows: service.search_requests("Рим", limit=10),
+    "statistics": lambda service, rows: service.get_statistics(),
+}
+
+@pytest.fixture(scope="module", params=DB_ROWS, ids=lambda rows: f"{rows}rows")
+def database(request, run, seeded_databases):
+    rows = request.param
+    engine = create_engine_for_url(f"sqlite+aiosqlite:///{seeded_databases(rows)}")
+    yield rows, create_session_factory(engine)
+    run(engine.dispose())
+
+@pytest.mark.parametrize("query", list(QUERIES))
+def test_database_query(benchmark, run, database, query):
+    rows, session_factory = database
+    benchmark.group = f"db-{query}"
+
+    async def execute():
+        async with session_factory() as session:
+            return await QUERIES[query](DatabaseService(session), rows)
+
+    result = benchmark.pedantic(lambda: run(execute()), rounds=5, warmup_rounds=1)
+
+    assert result is not None
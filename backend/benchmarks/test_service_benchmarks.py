@@ -0,0 +1,65 @@
+"""RecommendationService hot paths that run on the event loop for every request"""
+import pytest
+
+from app.schemas import Place, TravelRequestCreate, TravelRequestResponse
+from app.services import ExclusionSet, RecommendationService
+from benchmarks.seed_data import make_rows
+
+class RowsDatabaseService:
+    """Returns prebuilt rows without touching a database"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def get_all_travel_requests(self, limit: int = 10, offset: int = 0):
+        return self.rows[offset:offset + limit]
+
+def _recent(rows):
+    return [{"text": row.text, "exclude": row.exclude, "num_places": row.num_places} for row in rows]
+
+def test_build_context_from_history(benchmark):
+    service = RecommendationService(None, None)
+    recent = _recent(make_rows(5))
+    request = TravelRequestCreate(text="не хочу в Колізей і Ватикан", num_places=3)
+
+    context = benchmark(service._build_context_from_history, recent, request, ["Колізей", "Ватикан"])
+
+    assert "Current message" in context
+
+@pytest.mark.parametrize("rows", [10, 100])
+def test_accumulate_exclusions(benchmark, rows):
+    recent = _recent(make_rows(rows))
+
+    def accumulate():
+        # What create_recommendations does: the history set plus this turn's delta
+        excluded = RecommendationService._exclusion_set(recent)
+        excluded.add(["Vatican", "Trevi Fountain"])
+        return excluded
+
+    excluded = benchmark(accumulate)
+
+    assert "Trevi Fountain" in excluded
+
+@pytest.mark.parametrize("exclusions", [10, 100])
+def test_filter_excluded(benchmark, exclusions):
+    excluded = ExclusionSet([f"Excluded Sight {i}" for i in range(exclusions)] + ["Vatican"])
+    places = [
+        Place(name=name, description="x", coords={"lat": 41.9, "lng": 12.5})
+        for name in ["Vatican Museums", "Trattoria da Enzo al 29", "Excluded Sight 7", "Villa Borghese"]
+    ]
+
+    kept = benchmark(RecommendationService._filter_excluded, places, excluded)
+
+    assert [place.name for place in kept] == ["Trattoria da Enzo al 29", "Villa Borghese"]
+
+@pytest.mark.parametrize("rows", [10, 100])
+def test_response_assembly(benchmark, run, rows):
+    service = RecommendationService(RowsDatabaseService(make_rows(rows, num_places=5)), None)
+
+    def assemble():
+        # What GET /history does after the query: Place objects, then response validation
+        return [TravelRequestResponse(**rec) for rec in run(service.get_all_recommendations(limit=rows))]
+
+    responses = benchmark(assemble)
+
+    assert len(responses) == rows
@@ -0,0 +1,137 @@
+"""
+Aggregate throughput of POST /api/v1/recommendations/ from 1 to N workers.
+
+Starts a fake OpenAI upstream and the backend with a growing number of
+uvicorn workers (sharing one SQLite database and one shared-state file),
+then drives it with a fixed number of concurrent clients.
+
+Usage (from the backend directory):
+    python -m benchmarks.worker_scaling --max-workers 4 --concurrency 64 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready")
+
+@contextmanager
+def _server(app: str, port: int, env: Dict[str, str], workers: int = 1):
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", app,
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--no-access-log", "--log-level", "warning"
+        ],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        yield process
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+async def _load(base_url: str, concurrency: int, duration: float) -> Dict[str, float]:
+    completed = 0
+    errors = 0
+    latencies = []
+    stop_at = time.monotonic() + duration
+
+    async def client_loop(client_id: int):
+        nonlocal completed, errors
+        sequence = 0
+        async with httpx.AsyncClient(base_url=base_url, timeout=60.0) as client:
+            while time.monotonic() < stop_at:
+                sequence += 1
+                started = time.monotonic()
+                response = await client.post(
+                    "/api/v1/recommendations/",
+                    json={"text": f"Trip {client_id}-{sequence} to Rome", "num_places": 3}
+                )
+                if response.status_code == 200:
+                    completed += 1
+                    latencies.append(time.monotonic() - started)
+                else:
+                    errors += 1
+
+    started = time.monotonic()
+    await asyncio.gather(*[client_loop(i) for i in range(concurrency)])
+    elapsed = time.monotonic() - started
+    latencies.sort()
+    return {
+        "rps": completed / elapsed,
+        "errors": errors,
+        "p50": latencies[len(latencies) // 2] if latencies else 0.0,
+        "p95": latencies[int(len(latencies) * 0.95)] if latencies else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure throughput scaling across worker processes")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--upstream-latency", type=float, default=0.2, help="Fake OpenAI latency in seconds")
+    args = parser.parse_args()
+
+    upstream_port = _free_port()
+    upstream_env = dict(os.environ, FAKE_OPENAI_LATENCY=str(args.upstream_latency))
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, \
+            _server("benchmarks.fake_openai:app", upstream_port, upstream_env):
+        _wait_ready(f"http://127.0.0.1:{upstream_port}/docs")
+
+        for workers in range(1, args.max_workers + 1):
+            port = _free_port()
+            env = dict(
+                os.environ,
+                OPENAI_API_KEY="benchmark-key",
+                OPENAI_BASE_URL=f"http://127.0.0.1:{upstream_port}/v1",
+                DATABASE_URL=f"sqlite+aiosqlite:///{tmp}/bench-{workers}.db",
+                SHARED_STATE_PATH=f"{tmp}/shared-{workers}.db",
+                JOB_QUEUE_PATH=f"{tmp}/jobs-{workers}.db",
+                WARM_CONNECTIONS_ON_STARTUP="false",
+                HOST="127.0.0.1",
+                PORT=str(port)
+            )
+            with _server("app.main:app", port, env, workers=workers):
+                base_url = f"http://127.0.0.1:{port}"
+                _wait_ready(f"{base_url}/health")
+                # Let every worker build its lazily initialized clients first
+                asyncio.run(_load(base_url, workers * 4, 1.0))
+                results.append((workers, asyncio.run(_load(base_url, args.concurrency, args.duration))))
+
+    baseline = results[0][1]["rps"] or 1.0
+    print(f"{'workers':>7} {'req/s':>10} {'speedup':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for workers, stats in results:
+        print(
+            f"{workers:>7} {stats['rps']:10.1f} {stats['rps'] / baseline:8.2f} "
+            f"{stats['p50'] * 1000:8.1f} {stats['p95'] * 1000:8.1f} {stats['errors']:>7}"
+        )
+
+if __name__ == "__main__":
+    main()
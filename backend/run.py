@@ -1,16 +1,70 @@
+import argparse
 import uvicorn
-from app.main import app
 from app.core.config import settings
 
+def run_development():
+    """Single process with auto-reload"""
+    uvicorn.run(
+        "app.main:app",
+        host=settings.host,
+        port=settings.port,
+        reload=True,
+        timeout_graceful_shutdown=int(settings.shutdown_drain_timeout)
+    )
+
+def run_production(workers: int, preload: bool):
+    """Multiple workers on uvloop/httptools, without reload"""
+    if not preload:
+        uvicorn.run(
+            "app.main:app",
+            host=settings.host,
+            port=settings.port,
+            workers=workers,
+            loop="uvloop",
+            http="httptools",
+            reload=False,
+            access_log=False,
+            timeout_graceful_shutdown=int(settings.shutdown_drain_timeout)
+        )
+        return
+
+    # uvicorn spawns fresh interpreters per worker, so preloading the app
+    # before forking requires gunicorn as the process manager
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise SystemExit("--preload requires gunicorn: pip install gunicorn")
+
+    from app.main import app
+
+    class PreloadedApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{settings.host}:{settings.port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("worker_class", "uvicorn.workers.UvicornWorker")
+            self.cfg.set("preload_app", True)
+            self.cfg.set("graceful_timeout", int(settings.shutdown_drain_timeout))
+
+        def load(self):
+            return app
+
+    PreloadedApplication().run()
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Travel Recommender API")
+    parser.add_argument("--prod", action="store_true", help="Production mode: workers, uvloop/httptools, no reload")
+    parser.add_argument("--workers", type=int, default=settings.workers, help="Number of worker processes (production mode)")
+    parser.add_argument("--preload", action="store_true", help="Import the app once before forking workers (needs gunicorn)")
+    args = parser.parse_args()
+
     print(f"🚀 Starting server on {settings.host}:{settings.port}")
     print(f"📊 Database: {settings.database_url}")
     print(f"🤖 OpenAI Model: {settings.openai_model}")
+    if args.prod:
+        print(f"⚙️  Production mode: {args.workers} worker(s){', preloaded' if args.preload else ''}")
     print("=" * 50)
-    
-    uvicorn.run(
-        "app.main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=True
-    ) 
\ No newline at end of file
+
+    if args.prod:
+        run_production(args.workers, args.preload)
+    else:
+        run_development()
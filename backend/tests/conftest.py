@@ -0,0 +1,7 @@
+import os
+
+# Settings are read at import time, provide safe defaults for unit tests
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./test_travel_recommender.db")
+os.environ.setdefault("HOST", "127.0.0.1")
+os.environ.setdefault("PORT", "8000")
@@ -0,0 +1,71 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import List, Optional
+
+def make_places(num_places: int, prefix: str = "Place") -> List[dict]:
+    return [
+        {
+            "name": f"{prefix} {i}",
+            "description": f"Description {i}",
+            "coords": {"lat": 41.9 + i / 100, "lng": 12.5 + i / 100}
+        }
+        for i in range(1, num_places + 1)
+    ]
+
+def make_completion(content: str):
+    message = SimpleNamespace(content=content, role="assistant")
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=None)
+
+class FakeCompletions:
+    def __init__(self, responses: Optional[List] = None, delays: Optional[List[float]] = None):
+        self.responses = list(responses or [])
+        self.delays = list(delays or [])
+        self.calls = []
+
+    async def create(self, **kwargs):
+        index = len(self.calls)
+        self.calls.append(kwargs)
+        delay = self.delays[index] if index < len(self.delays) else 0.0
+        if delay:
+            await asyncio.sleep(delay)
+        if index < len(self.responses):
+            content = self.responses[index]
+            if isinstance(content, Exception):
+                raise content
+        else:
+            content = json.dumps({"places": make_places(3), "exclusions": []})
+        return make_completion(content)
+
+class FakeOpenAIClient:
+    """Stand-in for AsyncOpenAI exposing chat.completions.create"""
+
+    def __init__(self, responses: Optional[List] = None, delays: Optional[List[float]] = None):
+        self.completions = FakeCompletions(responses, delays)
+        self.chat = SimpleNamespace(completions=self.completions)
+
+class FakeDatabaseService:
+    """In-memory stand-in for DatabaseService used by RecommendationService"""
+
+    def __init__(self, recent_requests: Optional[List[dict]] = None, answers: Optional[List] = None):
+        self.recent_requests = list(recent_requests or [])
+        self.answers = list(answers or [])
+        self.created = []
+
+    async def get_recent_requests(self, limit: int = 5) -> List[dict]:
+        return self.recent_requests[:limit]
+
+    async def get_recent_answers(self, num_places: int, limit: int = 50) -> List:
+        return [answer for answer in self.answers if answer.num_places == num_places][:limit]
+
+    async def create_travel_request(self, request_data, response_json, exclusions=None):
+        record = SimpleNamespace(
+            id=len(self.created) + 1,
+            text=request_data.text,
+            exclude=exclusions or [],
+            num_places=request_data.num_places,
+            response_json=response_json,
+            created_at=None
+        )
+        self.created.append(record)
+        return record
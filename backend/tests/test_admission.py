@@ -0,0 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.admission import AdmissionController
+from app.core.exceptions import OverloadedError
+from app.schemas import TravelRequestCreate
+from app.services import OpenAIService, RecommendationService
+from tests.fakes import FakeDatabaseService, FakeOpenAIClient, make_places
+
+def test_excess_requests_queue_then_get_rejected():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=0.2)
+        release = asyncio.Event()
+        order = []
+
+        async def work(name):
+            async with admission.slot():
+                order.append(name)
+                await release.wait()
+
+        first = asyncio.create_task(work("first"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(work("second"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(OverloadedError) as full:
+            await admission.acquire()
+        metrics_while_busy = admission.metrics()
+
+        release.set()
+        await asyncio.gather(first, second)
+        return order, full.value, metrics_while_busy, admission.metrics()
+
+    order, full, busy, idle = asyncio.run(scenario())
+
+    assert order == ["first", "second"]
+    assert full.status_code == 429 and int(full.headers["Retry-After"]) >= 1
+    assert busy["in_flight"] == 1 and busy["queue_length"] == 1
+    assert idle["in_flight"] == 0 and idle["admitted"] == 2 and idle["rejected_queue_full"] == 1
+
+def test_queue_timeout_returns_503():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queue=5, queue_timeout=0.05)
+        await admission.acquire()
+        with pytest.raises(OverloadedError) as timed_out:
+            await admission.acquire()
+        admission.release(0.1)
+        return timed_out.value, admission.metrics()
+
+    error, metrics = asyncio.run(scenario())
+
+    assert error.status_code == 503
+    assert metrics["in_flight"] == 0 and metrics["queue_length"] == 0 and metrics["rejected_timeout"] == 1
+
+def test_degraded_answer_reuses_a_similar_request_without_the_model():
+    past = SimpleNamespace(text="Хочу в Рим, люблю історію", exclude=[], num_places=3, response_json=make_places(3))
+    client = FakeOpenAIClient()
+    database = FakeDatabaseService([{"text": "Хочу в Рим", "exclude": ["Place 2"]}], answers=[past])
+    service = RecommendationService(database, OpenAIService(client=client))
+
+    result = asyncio.run(service.create_degraded_recommendations(
+        TravelRequestCreate(text="Хочу в Рим, дуже люблю історію", num_places=3)
+    ))
+    refinement = asyncio.run(service.create_degraded_recommendations(
+        TravelRequestCreate(text="не хочу в Колізей", num_places=3)
+    ))
+
+    assert result["degraded"] == "similar"
+    assert [place.name for place in result["response_json"]] == ["Place 1", "Place 3"]
+    assert refinement is None
+    assert client.completions.calls == []
+
+def test_degraded_answers_are_bounded():
+    past = SimpleNamespace(text="Хочу в Рим, люблю історію", exclude=[], num_places=3, response_json=make_places(3))
+    database = FakeDatabaseService(answers=[past])
+    service = RecommendationService(database, OpenAIService(client=FakeOpenAIClient()))
+    request = TravelRequestCreate(text="Хочу в Рим, люблю історію", num_places=3)
+
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=0.05, max_degraded=1)
+        await admission.acquire()
+        async with admission.degraded_slot():
+            # Another degraded answer is already running, this one is rejected
+            with pytest.raises(OverloadedError):
+                await service.create_recommendations_admitted(request, admission)
+        degraded = await service.create_recommendations_admitted(request, admission)
+        return degraded, admission.metrics()
+
+    degraded, metrics = asyncio.run(scenario())
+
+    assert degraded["degraded"] == "similar"
+    assert metrics["rejected_degraded"] == 1 and metrics["degraded"] == 1 and metrics["degraded_in_flight"] == 0
+    assert len(database.created) == 1
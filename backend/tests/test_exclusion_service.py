@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import pytest
+
+from app.schemas import Place, TravelRequestCreate
+from app.services import ExclusionService, ExclusionSet, OpenAIService, RecommendationService
+from tests.fakes import FakeDatabaseService, FakeOpenAIClient, make_places
+
+@pytest.mark.parametrize("text, expected", [
+    ("не хочу в Колізей", ["Колізей"]),
+    ("і ще не хочу в Ватикан", ["Ватикан"]),
+    ("не хочу в Колізей і Ватикан, але люблю піцу", ["Колізей", "Ватикан"]),
+    ("I don't want to go to the Colosseum or the Vatican", ["Colosseum", "Vatican"]),
+    ("no quiero ir al Coliseo", ["Coliseo"]),
+    ("je ne veux pas visiter la Tour Eiffel, mais le Louvre oui", ["Tour Eiffel"]),
+    ("ich will nicht zum Kolosseum und Pantheon", ["Kolosseum", "Pantheon"]),
+    ("Хочу в Рим, люблю історію та макарони", []),
+    ("не хочу в колізей", ["колізей"]),
+    ("Хочу в Рим, крім того люблю музеї", []),
+    ("Paris, but skip the crowds", []),
+    ("I don't like spicy food", []),
+    ("I don't want to go to Rome, I want Paris", ["Rome"]),
+    ("Avoid the Louvre and Eiffel Tower please", ["Louvre", "Eiffel Tower"]),
+    ("Skip Trastevere, Show me more food places", ["Trastevere"]),
+    ("except Monday I am free in Rome", []),
+])
+def test_extract_exclusions_locally(text, expected):
+    assert ExclusionService.extract(text) == expected
+
+def test_aliases_share_a_canonical_key():
+    keys = {ExclusionService.canonical(name) for name in ["Колізей", "Colosseum", "Coliseo", "Колизей", "the Colosseum"]}
+    assert keys == {"colosseum"}
+
+def test_accumulated_exclusions_are_alias_aware():
+    history = [{"exclude": ["Колізей"]}, {"exclude": ["Ватикан", "Colosseum"]}]
+
+    excluded = RecommendationService._exclusion_set(history)
+
+    assert excluded.add(["Vatican", "Trevi Fountain"]) == ["Trevi Fountain"]
+    assert excluded.names() == ["Колізей", "Ватикан", "Trevi Fountain"]
+
+def test_matching_uses_aliases_and_containment():
+    excluded = ExclusionSet(["Колізей", "Ватикан"])
+
+    assert "Colosseum" in excluded and "the Vatican" in excluded and "Pantheon" not in excluded
+    assert excluded.match("Vatican Museums") == "Ватикан"
+    assert excluded.match("Colosseum Underground Tour") == "Колізей"
+    assert excluded.match("Trattoria da Enzo al 29") is None
+
+def test_violating_places_are_replaced_without_full_regeneration():
+    first = json.dumps({
+        "places": [
+            {"name": "Colosseum", "description": "x", "coords": {"lat": 41.89, "lng": 12.49}},
+            *make_places(2)
+        ],
+        "exclusions": []
+    })
+    replacement = json.dumps({"places": make_places(1, "Extra"), "exclusions": []})
+    client = FakeOpenAIClient(responses=[first, replacement])
+    database = FakeDatabaseService([{"text": "Хочу в Рим", "exclude": []}])
+    service = RecommendationService(database, OpenAIService(client=client))
+
+    result = asyncio.run(service.create_recommendations(TravelRequestCreate(text="не хочу в Колізей", num_places=3)))
+
+    assert [place.name for place in result["response_json"]] == ["Place 1", "Place 2", "Extra 1"]
+    assert result["exclude"] == ["Колізей"]
+    assert len(client.completions.calls) == 2
+    assert "EXACTLY 1 more" in client.completions.calls[1]["messages"][-1]["content"]
+
+def test_history_exclusions_are_listed_once_in_context():
+    history = [
+        {"text": "не хочу в Ватикан", "exclude": ["Колізей", "Ватикан"]},
+        {"text": "не хочу в Колізей", "exclude": ["Колізей"]}
+    ]
+    service = RecommendationService(database_service=None, openai_service=None)
+
+    context = service._build_context_from_history(
+        history, TravelRequestCreate(text="не хочу в Colosseum і Пантеон"), ["Colosseum", "Пантеон"]
+    )
+
+    assert context.count("Колізей") == 2
+    assert "Previously excluded: Колізей, Ватикан" in context
+    assert "Excluded in current message: Пантеон" in context
+
+def test_filtering_drops_only_excluded_places_and_exact_duplicates():
+    places = [
+        Place(name=name, description="x", coords={"lat": 41.9, "lng": 12.45})
+        for name in ["Vatican Museums", "St. Peter's Basilica", "Sistine Chapel", "Trattoria", "the Trattoria"]
+    ]
+
+    kept = RecommendationService._filter_excluded(places, ExclusionSet(["Louvre"]))
+
+    assert [place.name for place in kept] == ["Vatican Museums", "St. Peter's Basilica", "Sistine Chapel", "Trattoria"]
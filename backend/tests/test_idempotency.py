@@ -0,0 +1,66 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.admission import AdmissionController
+from app.core.exceptions import IdempotencyConflictError
+from app.core.shared_state import SharedState
+from app.schemas import TravelRequestCreate
+from app.services import OpenAIService, RecommendationService
+from tests.fakes import FakeDatabaseService, FakeOpenAIClient, make_places
+
+def test_retries_with_the_same_key_reuse_the_original_result(tmp_path):
+    async def scenario():
+        shared_state = SharedState(str(tmp_path / "shared.db"))
+        client = FakeOpenAIClient(delays=[0.1])
+        database = FakeDatabaseService()
+        service = RecommendationService(database, OpenAIService(client=client), shared_state)
+        request = TravelRequestCreate(text="Хочу в Рим", num_places=3)
+
+        # A retry arrives while the first attempt is still generating, another after it finished
+        first, in_progress = await asyncio.gather(
+            service.create_recommendations_idempotent(request, "retry-1"),
+            service.create_recommendations_idempotent(request, "retry-1")
+        )
+        later = await service.create_recommendations_idempotent(request, "retry-1")
+
+        with pytest.raises(IdempotencyConflictError):
+            await service.create_recommendations_idempotent(TravelRequestCreate(text="Хочу в Париж"), "retry-1")
+
+        shared_state.close()
+        return first, in_progress, later, client, database
+
+    first, in_progress, later, client, database = asyncio.run(scenario())
+
+    assert first[1] is False and in_progress[1] is True and later[1] is True
+    assert first[0] == in_progress[0] == later[0]
+    assert len(client.completions.calls) == 1
+    assert len(database.created) == 1
+
+def test_degraded_answers_are_stored_under_the_key(tmp_path):
+    async def scenario():
+        shared_state = SharedState(str(tmp_path / "shared.db"))
+        past = SimpleNamespace(text="Хочу в Рим, люблю історію", exclude=[], num_places=3, response_json=make_places(3))
+        client = FakeOpenAIClient()
+        database = FakeDatabaseService(answers=[past])
+        service = RecommendationService(database, OpenAIService(client=client), shared_state)
+        request = TravelRequestCreate(text="Хочу в Рим, люблю історію", num_places=3)
+
+        # Capacity is taken, so the first attempt is answered degraded
+        admission = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=0.05)
+        await admission.acquire()
+        create = lambda: service.create_recommendations_admitted(request, admission)
+        first = await service.create_recommendations_idempotent(request, "retry-1", create)
+        admission.release(0.1)
+        retry = await service.create_recommendations_idempotent(request, "retry-1", create)
+
+        shared_state.close()
+        return first, retry, client, database
+
+    first, retry, client, database = asyncio.run(scenario())
+
+    assert first[0]["degraded"] == "similar" and first[1] is False
+    assert retry == (first[0], True)
+    assert client.completions.calls == []
+    assert len(database.created) == 1
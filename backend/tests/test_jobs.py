@@ -0,0 +1,152 @@
+import asyncio
+
+from app.core.config import settings
+from app.core.database import Base, create_engine_for_url, create_session_factory
+from app.core.job_queue import JobQueue
+from app.services import JobWorkerPool, OpenAIService
+from tests.fakes import FakeOpenAIClient
+
+async def _wait_for_status(queue, job_id, statuses, timeout=5.0):
+    for _ in range(int(timeout / 0.02)):
+        job = await queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"job stayed {job['status']}")
+
+def test_jobs_are_retried_and_cancelled(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "openai_fallback_models", [])
+    monkeypatch.setattr(settings, "job_retry_delay", 0.01)
+    monkeypatch.setattr(settings, "job_poll_interval", 0.02)
+    monkeypatch.setattr(settings, "job_cancel_check_interval", 0.02)
+
+    async def scenario():
+        engine = create_engine_for_url(f"sqlite+aiosqlite:///{tmp_path / 'travel.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        queue = JobQueue(str(tmp_path / "jobs.db"))
+        # First attempt fails, the retry succeeds; the slow third call belongs to the cancelled job
+        client = FakeOpenAIClient(responses=[ValueError("upstream broke")], delays=[0, 0, 10])
+        pool = JobWorkerPool(queue, create_session_factory(engine), OpenAIService(client=client), concurrency=1)
+        pool.start()
+
+        job = await queue.submit({"text": "Хочу в Рим", "num_places": 3}, max_attempts=3)
+        pool.notify()
+        done = await _wait_for_status(queue, job["id"], ("succeeded", "failed"))
+
+        slow = await queue.submit({"text": "Хочу в Париж", "num_places": 3})
+        await _wait_for_status(queue, slow["id"], ("running",))
+        cancelled = await queue.cancel(slow["id"])
+        await asyncio.sleep(0.1)
+        after_cancel = await queue.get(slow["id"])
+
+        metrics = pool.metrics()
+        await pool.stop()
+        queue.close()
+        await engine.dispose()
+        return done, cancelled, after_cancel, metrics
+
+    done, cancelled, after_cancel, metrics = asyncio.run(scenario())
+
+    assert done["status"] == "succeeded" and done["attempts"] == 2
+    assert len(done["result"]["response_json"]) == 3 and done["result"]["id"] == 1
+    assert cancelled["status"] == "cancelled" and after_cancel["status"] == "cancelled"
+    assert metrics["succeeded"] == 1 and metrics["retried"] == 1 and metrics["cancelled"] == 1
+    assert metrics["running"] == 0
+
+def test_stopping_the_pool_requeues_running_jobs(tmp_path):
+    async def scenario():
+        queue = JobQueue(str(tmp_path / "jobs.db"))
+        pool = JobWorkerPool(queue, None, None, concurrency=1)
+
+        async def slow_handle(payload):
+            await asyncio.sleep(10)
+
+        pool._handle = slow_handle
+        pool.start()
+        job = await queue.submit({"text": "Хочу в Рим"})
+        pool.notify()
+        await _wait_for_status(queue, job["id"], ("running",))
+        await pool.stop()
+        job = await queue.get(job["id"])
+        queue.close()
+        return job
+
+    job = asyncio.run(scenario())
+
+    assert job["status"] == "queued" and job["attempts"] == 0
+
+def test_worker_survives_queue_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "job_poll_interval", 0.02)
+
+    async def scenario():
+        queue = JobQueue(str(tmp_path / "jobs.db"))
+        pool = JobWorkerPool(queue, None, None, concurrency=1)
+        complete = queue.complete
+        failures = []
+
+        async def flaky_complete(job_id, result):
+            if not failures:
+                failures.append(job_id)
+                raise RuntimeError("database is locked")
+            return await complete(job_id, result)
+
+        async def handle(payload):
+            return {"ok": True}
+
+        queue.complete = flaky_complete
+        pool._handle = handle
+        pool.start()
+        await queue.submit({"text": "Хочу в Рим"})
+        second = await queue.submit({"text": "Хочу в Париж"})
+        pool.notify()
+        done = await _wait_for_status(queue, second["id"], ("succeeded",))
+        metrics = pool.metrics()
+        await pool.stop()
+        queue.close()
+        return done, metrics
+
+    done, metrics = asyncio.run(scenario())
+
+    assert done["result"] == {"ok": True}
+    assert metrics["workers"] == 1 and metrics["succeeded"] == 1
+
+def test_finished_jobs_are_purged_after_retention(tmp_path):
+    async def scenario():
+        queue = JobQueue(str(tmp_path / "jobs.db"))
+        finished = await queue.submit({"text": "Хочу в Рим"})
+        await queue.cancel(finished["id"])
+        pending = await queue.submit({"text": "Хочу в Париж"})
+        kept = await queue.purge_finished(older_than=60)
+        purged = await queue.purge_finished(older_than=-1)
+        remaining = await queue.get(finished["id"]), await queue.get(pending["id"])
+        queue.close()
+        return kept, purged, remaining
+
+    kept, purged, (finished, pending) = asyncio.run(scenario())
+
+    assert kept == 0 and purged == 1
+    assert finished is None and pending["status"] == "queued"
+
+def test_idle_claims_do_not_take_the_write_lock(tmp_path, monkeypatch):
+    async def scenario():
+        queue = JobQueue(str(tmp_path / "jobs.db"))
+        writes = []
+        run = queue._run
+
+        def recording_run(fn, *args, write=True):
+            writes.append(write)
+            return run(fn, *args, write=write)
+
+        monkeypatch.setattr(queue, "_run", recording_run)
+        empty = await queue.claim(lease_ttl=30)
+        idle_writes = list(writes)
+        submitted = await queue.submit({"text": "Хочу в Рим"})
+        claimed = await queue.claim(lease_ttl=30)
+        queue.close()
+        return empty, idle_writes, submitted, claimed
+
+    empty, idle_writes, submitted, claimed = asyncio.run(scenario())
+
+    assert empty is None and idle_writes == [False]
+    assert claimed["id"] == submitted["id"] and claimed["status"] == "running"
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.resources import resources
+from app.main import app
+
+def test_lifespan_creates_and_closes_resources(tmp_path, monkeypatch):
+    """Clients exist only while the application lifespan is running"""
+    monkeypatch.setattr(settings, "database_url", f"sqlite+aiosqlite:///{tmp_path}/lifespan.db")
+    monkeypatch.setattr(settings, "warm_connections_on_startup", False)
+    monkeypatch.setattr(settings, "job_queue_path", str(tmp_path / "jobs.db"))
+
+    with TestClient(app) as client:
+        # Default startup (job workers on) leaves the OpenAI stack to the first request
+        assert resources._openai_service is None and resources._openai_client is None
+        http_client = resources.http_client
+        assert resources.openai_service.client is resources.openai_client
+        assert client.get("/health").status_code == 200
+        origin = settings.cors_origins[0]
+        assert client.get("/health", headers={"Origin": origin}).headers["access-control-allow-origin"] == origin
+        assert resources.in_flight == 0
+
+    assert http_client.is_closed
+    assert resources._engine is None
+    assert resources._openai_service is None
+
+def test_importing_the_app_does_not_build_settings():
+    code = "import app.main; from app.core.config import get_settings; print(get_settings.cache_info().currsize)"
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=backend, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "0"
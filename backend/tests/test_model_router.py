@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+import httpx
+from openai import APIConnectionError
+
+from app.core.config import settings
+from app.schemas import TravelRequestCreate
+from app.services import RecommendationService
+from app.services.openai_service import OpenAIService
+from tests.fakes import FakeDatabaseService, FakeOpenAIClient, make_places
+
+def test_short_refinement_with_history_uses_fast_model():
+    service = OpenAIService(client=FakeOpenAIClient())
+
+    refinement = service.router.choose("не хочу в Колізей", has_history=True, num_places=3)
+    fresh = service.router.choose("Хочу в Рим, люблю історію та макарони", has_history=False, num_places=3)
+    large = service.router.choose("не хочу в Колізей", has_history=True, num_places=10)
+
+    assert refinement[0].model == settings.openai_fast_model
+    assert fresh[0].model == settings.openai_model
+    assert large[0].model == settings.openai_model
+
+def test_errors_fall_back_to_next_model(monkeypatch):
+    monkeypatch.setattr(settings, "openai_fallback_models", ["fallback-model"])
+    error = APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    client = FakeOpenAIClient(responses=[error])
+    service = OpenAIService(client=client)
+
+    places, _, _ = asyncio.run(service.generate_recommendations("Rome", num_places=3, max_retries=0))
+
+    assert len(places) == 3
+    assert [call["model"] for call in client.completions.calls] == [settings.openai_model, "fallback-model"]
+    metrics = service.metrics()["models"]
+    assert metrics[f"openai:{settings.openai_model}"]["error_rate"] == 1.0
+    assert metrics["openai:fallback-model"]["errors"] == 0
+
+def test_exclusion_replacements_use_the_route_that_served_the_answer(monkeypatch):
+    monkeypatch.setattr(settings, "openai_fallback_models", ["fallback-model"])
+    answer = json.dumps({
+        "places": [{"name": "Colosseum", "description": "x", "coords": {"lat": 41.89, "lng": 12.49}}, *make_places(2)],
+        "exclusions": []
+    })
+    client = FakeOpenAIClient(responses=[RuntimeError("down"), answer, RuntimeError("down"), RuntimeError("down")])
+    service = RecommendationService(FakeDatabaseService(), OpenAIService(client=client))
+
+    result = asyncio.run(service.create_recommendations(TravelRequestCreate(text="не хочу в Колізей", num_places=3)))
+
+    # The replacement tries the fallback that answered before the primary, and failing keeps the valid places
+    models = [call["model"] for call in client.completions.calls]
+    assert models == [settings.openai_model, "fallback-model", "fallback-model", settings.openai_model]
+    assert [place.name for place in result["response_json"]] == ["Place 1", "Place 2"]
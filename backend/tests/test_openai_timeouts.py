@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.core.deadline import deadline_scope
+from app.core.exceptions import DeadlineExceededError
+from app.services.openai_service import OpenAIService
+from tests.fakes import FakeOpenAIClient, make_places
+
+def _service(client: FakeOpenAIClient, samples: float = 0.05) -> OpenAIService:
+    service = OpenAIService(client=client)
+    for _ in range(settings.openai_latency_min_samples):
+        service.latency.record(samples)
+    return service
+
+def test_timeout_adapts_to_latency_and_deadline():
+    service = _service(FakeOpenAIClient())
+    assert service._attempt_timeout() == settings.openai_timeout_min
+
+    with deadline_scope(1.0):
+        assert service._attempt_timeout() <= 1.0
+
+    with deadline_scope(0.0):
+        with pytest.raises(DeadlineExceededError):
+            service._attempt_timeout()
+
+def test_hedged_request_wins_over_slow_primary(monkeypatch):
+    monkeypatch.setattr(settings, "openai_hedging_enabled", True)
+    monkeypatch.setattr(settings, "openai_hedge_max_ratio", 1.0)
+
+    hedge_content = json.dumps({"places": make_places(3, "Hedge"), "exclusions": []})
+    client = FakeOpenAIClient(responses=["{}", hedge_content], delays=[2.0, 0.0])
+    service = _service(client)
+
+    places, _, _ = asyncio.run(service.generate_recommendations("Rome", num_places=3))
+
+    assert [place.name for place in places][0] == "Hedge 1"
+    assert len(client.completions.calls) == 2
+    assert service.metrics()["hedge_win_rate"] == 1.0
+
+def test_hedging_respects_cost_cap(monkeypatch):
+    monkeypatch.setattr(settings, "openai_hedging_enabled", True)
+    monkeypatch.setattr(settings, "openai_hedge_max_ratio", 0.0)
+
+    client = FakeOpenAIClient(delays=[0.2])
+    service = _service(client)
+    asyncio.run(service.generate_recommendations("Rome", num_places=3))
+
+    assert len(client.completions.calls) == 1
+    assert service.metrics()["hedged"] == 0
@@ -0,0 +1,81 @@
+import asyncio
+
+from app.core.config import settings
+from app.core.database import Base, create_engine_for_url, create_session_factory
+from app.core.shared_state import SharedState
+from app.models import TravelRequest
+from app.schemas import TravelRequestCreate
+from app.services import OpenAIService, PrewarmService, RecommendationService
+from tests.fakes import FakeDatabaseService, FakeOpenAIClient
+
+async def _seed(session_factory, texts):
+    async with session_factory() as session:
+        for text, exclude in texts:
+            session.add(TravelRequest(text=text, exclude=exclude, num_places=3, response_json=[]))
+        await session.commit()
+
+def test_popular_requests_are_prewarmed_and_served_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "prewarm_min_count", 2)
+    monkeypatch.setattr(settings, "prewarm_budget_usd", 1.0)
+
+    async def scenario():
+        engine = create_engine_for_url(f"sqlite+aiosqlite:///{tmp_path / 'travel.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = create_session_factory(engine)
+        await _seed(session_factory, [
+            ("Хочу в Рим, люблю історію", []),
+            ("хочу в рим люблю історію!", []),
+            ("Хочу в Рим, люблю історію", []),
+            ("не хочу в Колізей", ["Колізей"]),
+            ("Paris for art lovers", []),
+        ])
+
+        shared_state = SharedState(str(tmp_path / "shared.db"))
+        client = FakeOpenAIClient()
+        openai_service = OpenAIService(client=client, shared_state=shared_state)
+        prewarm = PrewarmService(session_factory, openai_service, shared_state)
+
+        popular = await prewarm.find_popular_requests()
+        summary = await prewarm.run_once()
+        again = await prewarm.run_once()
+
+        service = RecommendationService(FakeDatabaseService(), openai_service)
+        result = await service.create_recommendations(TravelRequestCreate(text="Хочу в Рим. Люблю історію", num_places=3))
+
+        shared_state.close()
+        await engine.dispose()
+        return popular, summary, again, result, client
+
+    popular, summary, again, result, client = asyncio.run(scenario())
+
+    assert popular == [{"text": "Хочу в Рим, люблю історію", "num_places": 3, "count": 3}]
+    assert summary["warmed"] == 1 and summary["spent_usd"] > 0
+    assert again["warmed"] == 0 and again["skipped"] == 1
+    assert len(result["response_json"]) == 3
+    assert len(client.completions.calls) == 1  # The user request was a cache hit
+
+def test_prewarm_stops_at_the_spend_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "prewarm_min_count", 1)
+    monkeypatch.setattr(settings, "prewarm_budget_usd", 0.0)
+
+    async def scenario():
+        engine = create_engine_for_url(f"sqlite+aiosqlite:///{tmp_path / 'travel.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = create_session_factory(engine)
+        await _seed(session_factory, [("Barcelona with kids", [])])
+
+        shared_state = SharedState(str(tmp_path / "shared.db"))
+        client = FakeOpenAIClient()
+        prewarm = PrewarmService(session_factory, OpenAIService(client=client, shared_state=shared_state), shared_state)
+        summary = await prewarm.run_once()
+
+        shared_state.close()
+        await engine.dispose()
+        return summary, client
+
+    summary, client = asyncio.run(scenario())
+
+    assert summary["candidates"] == 1 and summary["warmed"] == 0
+    assert client.completions.calls == []
@@ -0,0 +1,77 @@
+import asyncio
+import sys
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.middleware.profiling_middleware import ProfilingMiddleware
+from app.core.profiling import LoopLagMonitor, SlowRequestLog, stage, stage_scope
+from app.core.resources import resources
+from app.main import app
+from app.schemas import TravelRequestResponse
+from tests.fakes import make_places
+
+def test_loop_monitor_attributes_stalls_to_pydantic():
+    async def scenario():
+        monitor = LoopLagMonitor(interval=0.02, block_threshold=0.05)
+        monitor.start()
+        await asyncio.sleep(0.05)
+
+        # Validate responses synchronously on the loop, as a route would
+        payload = {"id": 1, "text": "Rome", "exclude": [], "num_places": 50, "response_json": make_places(50), "created_at": "2024-01-01T00:00:00"}
+        stop_at = time.monotonic() + 0.3
+        while time.monotonic() < stop_at:
+            TravelRequestResponse(**payload)
+
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor.metrics()
+
+    metrics = asyncio.run(scenario())
+
+    assert metrics["max_lag_ms"] >= 200
+    assert max(metrics["blocked_samples"], key=metrics["blocked_samples"].get) == "pydantic"
+    assert metrics["recent_stalls"] and metrics["recent_stalls"][0]["stack"]
+
+def test_slow_request_log_keeps_the_slowest_with_stages():
+    log = SlowRequestLog(size=2)
+    for duration in [0.1, 0.5, 0.3]:
+        with stage_scope() as stages:
+            with stage("openai"):
+                pass
+        log.record(duration, {"duration": duration, "stages": stages})
+
+    assert [entry["duration"] for entry in log.slowest()] == [0.5, 0.3]
+    assert "openai" in log.slowest()[0]["stages"]
+
+def test_profiling_and_admin_endpoints_require_the_admin_token(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "database_url", f"sqlite+aiosqlite:///{tmp_path}/profiling.db")
+    monkeypatch.setattr(settings, "warm_connections_on_startup", False)
+    monkeypatch.setattr(settings, "job_queue_path", str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    # Start from an empty slow-request log whatever ran in this process before
+    monkeypatch.setattr(resources, "_slow_requests", None)
+
+    with TestClient(app) as client:
+        assert client.get("/health", headers={"X-Profile": "cprofile"}).json() == {"status": "healthy"}
+        profiled = client.get("/health", headers={"X-Profile": "cprofile", "X-Admin-Token": "secret"})
+        forbidden = client.get("/admin/slow-requests", headers={"X-Admin-Token": "wrong"})
+        slow = client.get("/admin/slow-requests", headers={"X-Admin-Token": "secret"}).json()
+        loop = client.get("/admin/event-loop", headers={"X-Admin-Token": "secret"}).json()
+
+    assert "function calls" in profiled.text and profiled.headers["X-Profiled-Status"] == "200"
+    assert forbidden.status_code == 403
+    assert any(entry["path"] == "/health" and "framework_ms" in entry for entry in slow)
+    assert "lag" in loop
+
+def test_profiler_is_stopped_when_the_request_fails():
+    async def failing_call_next(request):
+        raise RuntimeError("handler broke")
+
+    middleware = ProfilingMiddleware(app)
+    with pytest.raises(RuntimeError):
+        asyncio.run(middleware._profile(None, failing_call_next, "cprofile"))
+
+    assert sys.getprofile() is None
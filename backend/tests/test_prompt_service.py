@@ -0,0 +1,77 @@
+import asyncio
+import sys
+import threading
+import types
+
+from app.core.config import settings
+from app.schemas import TravelRequestCreate
+from app.services import PromptService, RecommendationService
+from app.services import token_counter
+from app.services.token_counter import count_tokens
+
+def test_static_instructions_form_a_stable_compact_prefix():
+    system_prompt = PromptService.get_system_prompt()
+    user_prompt = PromptService.generate_recommendation_prompt("  Хочу в Рим  ", 4)
+
+    assert system_prompt == PromptService.get_system_prompt()
+    assert all(line == line.strip() and line for line in system_prompt.splitlines())
+    assert "EXACTLY 4" in user_prompt and user_prompt.endswith("Хочу в Рим")
+    assert count_tokens(user_prompt) < count_tokens(system_prompt) // 4
+
+def test_history_context_respects_token_budget(monkeypatch):
+    monkeypatch.setattr(settings, "prompt_history_token_budget", 40)
+    history = [
+        {"text": f"Хочу в Рим, люблю історію та макарони {i}", "exclude": ["Колізей"]}
+        for i in range(10)
+    ]
+    service = RecommendationService(database_service=None, openai_service=None)
+
+    context = service._build_context_from_history(history, TravelRequestCreate(text="не хочу в Ватикан"))
+
+    assert "Message 1:" in context
+    assert "Message 10:" not in context
+    assert context.count("Current message: не хочу в Ватикан") == 1
+
+def test_tokenizer_failure_is_retried_later(monkeypatch):
+
+    calls = []
+
+    def encoding_for_model(model):
+        calls.append(model)
+        raise OSError("offline")
+
+    monkeypatch.setitem(sys.modules, "tiktoken", types.SimpleNamespace(encoding_for_model=encoding_for_model))
+    monkeypatch.setattr(token_counter, "_encoders", {})
+    monkeypatch.setattr(token_counter, "_retry_at", {})
+
+    assert count_tokens("Хочу в Рим", "test-model") == token_counter._approximate_tokens("Хочу в Рим")
+    count_tokens("Хочу в Рим", "test-model")
+    assert calls == ["test-model"]
+
+    token_counter._retry_at["test-model"] = 0.0
+    count_tokens("Хочу в Рим", "test-model")
+    assert calls == ["test-model", "test-model"]
+
+def test_tokenizer_loads_off_the_event_loop(monkeypatch):
+
+    threads = []
+    encoding = types.SimpleNamespace(encode=lambda text: text.split())
+
+    def encoding_for_model(model):
+        threads.append(threading.current_thread())
+        return encoding
+
+    monkeypatch.setitem(sys.modules, "tiktoken", types.SimpleNamespace(encoding_for_model=encoding_for_model))
+    monkeypatch.setattr(token_counter, "_encoders", {})
+    monkeypatch.setattr(token_counter, "_retry_at", {})
+
+    async def run():
+        first = count_tokens("a b c", "test-model")
+        await asyncio.sleep(0.05)
+        return first, count_tokens("a b c", "test-model")
+
+    first, second = asyncio.run(run())
+
+    assert first == token_counter._approximate_tokens("a b c")
+    assert second == 3
+    assert threads and threads[0] is not threading.main_thread()
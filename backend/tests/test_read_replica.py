@@ -0,0 +1,42 @@
+import asyncio
+import shutil
+
+from app.core.database import Base, create_engine_for_url, create_session_factory
+from app.schemas import TravelRequestCreate
+from app.services import DatabaseService
+
+def test_reads_use_the_replica_except_for_just_created_rows(tmp_path):
+    """A stale SQLite file copy stands in for a lagging replica"""
+    primary_path, replica_path = tmp_path / "primary.db", tmp_path / "replica.db"
+
+    async def scenario():
+        engine = create_engine_for_url(f"sqlite+aiosqlite:///{primary_path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with create_session_factory(engine)() as session:
+            await DatabaseService(session).create_travel_request(TravelRequestCreate(text="Хочу в Рим"), [])
+        await engine.dispose()  # Checkpoint the WAL before copying the file
+        shutil.copy(primary_path, replica_path)
+
+        engine = create_engine_for_url(f"sqlite+aiosqlite:///{primary_path}")
+        read_engine = create_engine_for_url(f"sqlite+aiosqlite:///{replica_path}")
+        async with create_session_factory(engine)() as db, create_session_factory(read_engine)() as read_db:
+            writer = DatabaseService(db, read_db)
+            created = await writer.create_travel_request(TravelRequestCreate(text="Хочу в Париж"), [])
+
+        async with create_session_factory(engine)() as db, create_session_factory(read_engine)() as read_db:
+            # A later request in the same process still sees its own write
+            reader = DatabaseService(db, read_db)
+            just_created = await reader.get_travel_request_by_id(created.id)
+            history = await reader.get_all_travel_requests()
+            statistics = await reader.get_statistics()
+
+        await engine.dispose()
+        await read_engine.dispose()
+        return created, just_created, history, statistics
+
+    created, just_created, history, statistics = asyncio.run(scenario())
+
+    assert just_created is not None and just_created.text == "Хочу в Париж"
+    assert [request.text for request in history] == ["Хочу в Рим"]  # Served by the stale replica
+    assert statistics["total_requests"] == 1
@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.core.exceptions import OpenAIError
+from app.core.shared_state import SharedState
+from app.services.openai_service import OpenAIService
+from app.services.response_parser import parse_recommendations
+from tests.fakes import FakeOpenAIClient, make_places
+
+def test_valid_output_is_parsed_in_one_pass():
+    content = json.dumps({"places": make_places(2), "exclusions": ["Колізей"]})
+
+    places, exclusions, repaired = parse_recommendations(content)
+
+    assert [place.name for place in places] == ["Place 1", "Place 2"]
+    assert exclusions == ["Колізей"]
+    assert not repaired
+
+def test_truncated_and_fenced_output_is_salvaged():
+    full = json.dumps({"exclusions": ["Vatican"], "places": make_places(3)})
+    truncated = "```json\n" + full[:full.rindex('"coords"')]
+
+    places, exclusions, repaired = parse_recommendations(truncated)
+
+    assert repaired
+    assert exclusions == ["Vatican"]
+    assert [place.name for place in places] == ["Place 1", "Place 2"]
+
+def test_invalid_items_are_dropped():
+    items = make_places(2) + [{"name": "No coords", "description": "x"}, "garbage"]
+
+    places, _, repaired = parse_recommendations(json.dumps({"places": items, "exclusions": []}))
+
+    assert repaired
+    assert len(places) == 2
+
+def test_shortfall_requests_only_missing_places():
+    full = json.dumps({"places": make_places(2), "exclusions": []})
+    first = full[:full.rindex('"coords"')]
+    top_up = json.dumps({"places": make_places(1, "Extra"), "exclusions": []})
+    client = FakeOpenAIClient(responses=[first, top_up])
+    service = OpenAIService(client=client)
+
+    places, _, _ = asyncio.run(service.generate_recommendations("Rome", num_places=2))
+
+    assert [place.name for place in places] == ["Place 1", "Extra 1"]
+    assert "EXACTLY 1 more" in client.completions.calls[1]["messages"][-1]["content"]
+    assert "Place 1" in client.completions.calls[1]["messages"][-1]["content"]
+
+def test_unsalvageable_output_raises_and_is_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "openai_fallback_models", [])
+    client = FakeOpenAIClient(responses=["Sorry, I can't help with that.", "Still not JSON"])
+    shared_state = SharedState(str(tmp_path / "shared.db"))
+    service = OpenAIService(client=client, shared_state=shared_state)
+
+    with pytest.raises(OpenAIError):
+        asyncio.run(service.generate_recommendations("Rome", num_places=2))
+
+    # The next identical request calls the model again instead of getting an empty answer
+    places, _, _ = asyncio.run(service.generate_recommendations("Rome", num_places=2))
+    assert len(places) == 2
+    assert len(client.completions.calls) == 3
+    shared_state.close()
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.resources import ResourceContainer
+from app.core.shared_state import SharedState
+
+@pytest.fixture
+def state(tmp_path):
+    shared = SharedState(str(tmp_path / "shared.db"))
+    yield shared
+    shared.close()
+
+def test_cache_roundtrip_and_expiry(state):
+    async def scenario():
+        await state.cache_set("a", {"places": [1, 2]}, ttl=60)
+        await state.cache_set("b", "stale", ttl=-1)
+        return await state.cache_get("a"), await state.cache_get("b"), await state.purge_expired()
+
+    value, expired, purged = asyncio.run(scenario())
+    assert value == {"places": [1, 2]}
+    assert expired is None
+    assert purged == 1
+
+def test_get_or_compute_runs_once(state):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return ["result"]
+
+    async def scenario():
+        return await asyncio.gather(*[
+            state.get_or_compute("key", compute, ttl=60) for _ in range(5)
+        ])
+
+    assert asyncio.run(scenario()) == [["result"]] * 5
+    assert len(calls) == 1
+
+def test_leases_are_exclusive_between_owners(tmp_path):
+    first = SharedState(str(tmp_path / "shared.db"))
+    second = SharedState(str(tmp_path / "shared.db"))
+
+    async def scenario():
+        taken = await first.try_lease("job", ttl=60)
+        blocked = await second.try_lease("job", ttl=60)
+        await first.release_lease("job")
+        return taken, blocked, await second.try_lease("job", ttl=60)
+
+    assert asyncio.run(scenario()) == (True, False, True)
+    first.close()
+    second.close()
+
+def test_token_bucket_limits_rate(state):
+    async def scenario():
+        await state.acquire("openai", rate=1.0, capacity=2)
+        await state.acquire("openai", rate=1.0, capacity=2)
+        with pytest.raises(TimeoutError):
+            await state.acquire("openai", rate=1.0, capacity=2, max_wait=0.1)
+
+    asyncio.run(scenario())
+
+def test_maintenance_purges_expired_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "shared_state_path", str(tmp_path / "shared.db"))
+    monkeypatch.setattr(settings, "jobs_enabled", False)
+    container = ResourceContainer()
+
+    async def scenario():
+        await container.shared_state.cache_set("fresh", 1, ttl=60)
+        await container.shared_state.cache_set("stale", 1, ttl=-1)
+        deleted = await container.run_maintenance()
+        return deleted, await container.shared_state.cache_get("fresh")
+
+    deleted, fresh = asyncio.run(scenario())
+    container.shared_state.close()
+
+    assert deleted == {"shared_state": 1}
+    assert fresh == 1